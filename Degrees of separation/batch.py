@@ -0,0 +1,132 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import degrees
+
+# Answer queries by walking cached BFS trees of their sources (set by main)
+use_tree_cache = False
+
+
+def resolve(value):
+    """
+    Returns a (person_id, error) pair for a batch query field, which may
+    be either an IMDB person id or a name. Ambiguous names are reported
+    as an error listing the candidate ids instead of prompting.
+
+    If the name index is loaded, a name with no exact match resolves
+    to the closest indexed name instead.
+    """
+    if value in degrees.people:
+        return value, None
+    person_ids = [candidate["id"] for candidate in degrees.candidates_for_name(value)]
+    if len(person_ids) == 0:
+        suggestions = degrees.suggest_names(value, limit=1)
+        if suggestions:
+            return resolve(suggestions[0])
+        return None, f"Person not found: {value}"
+    elif len(person_ids) > 1:
+        return None, f"Ambiguous name: {value} (ids {', '.join(person_ids)})"
+    else:
+        return person_ids[0], None
+
+
+def run_query(query):
+    """
+    Answers one (source, target, bidirectional) query against the
+    loaded data and returns the result as a JSON-serialisable dictionary.
+    """
+    source, target, bidirectional = query
+    start = time.perf_counter()
+    result = {"source": source, "target": target}
+
+    source_id, error = resolve(source)
+    if error is None:
+        target_id, error = resolve(target)
+    if error is not None:
+        result["error"] = error
+    else:
+        result["source_id"] = source_id
+        result["target_id"] = target_id
+        if use_tree_cache:
+            path = degrees.cached_shortest_path(source_id, target_id)
+        else:
+            path = degrees.shortest_path(source_id, target_id, bidirectional=bidirectional)
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def read_queries(f, bidirectional):
+    """
+    Yields (source, target, bidirectional) queries from a file with one
+    tab-separated source/target pair per line. Blank lines are skipped.
+    """
+    for line in f:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        fields = line.split("\t")
+        if len(fields) != 2:
+            raise ValueError(f"Expected 'source<TAB>target', got: {line!r}")
+        yield fields[0].strip(), fields[1].strip(), bidirectional
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries in parallel, "
+                    "printing one JSON result per line."
+    )
+    parser.add_argument("directory", nargs="?", default="databases")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="file of tab-separated source/target names or ids "
+                             "(default: stdin)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people and meet in the middle")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the cast graph as integer CSR arrays")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from (or create) a memory-mapped snapshot")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="resolve mistyped names to the closest indexed name")
+    parser.add_argument("--tree-cache", action="store_true",
+                        help="reuse a cached BFS tree for queries sharing a source")
+    parser.add_argument("--costar-index", action="store_true",
+                        help="precompute every person's co-stars before forking")
+    args = parser.parse_args()
+
+    global use_tree_cache
+    use_tree_cache = args.tree_cache
+
+    # Load once in the parent; forked workers share the pages copy-on-write
+    info = degrees.load_data(args.directory, compact=args.compact, snapshot=args.snapshot,
+                             index_names=args.fuzzy)
+    print(f"Data loaded from {info['source']} in {info['seconds']:.2f}s.", file=sys.stderr)
+    if args.costar_index:
+        degrees.build_costar_index()
+
+    f = sys.stdin if args.queries == "-" else open(args.queries, encoding="utf-8")
+    try:
+        queries = read_queries(f, args.bidirectional)
+        if args.processes <= 1:
+            for result in map(run_query, queries):
+                print(json.dumps(result), flush=True)
+        else:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(args.processes) as pool:
+                for result in pool.imap(run_query, queries, chunksize=4):
+                    print(json.dumps(result), flush=True)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+if __name__ == "__main__":
+    main()
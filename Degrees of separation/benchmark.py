@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+
+import degrees
+from generate import generate
+from landmarks import goal_directed_path
+from util import QueueFrontier, HashedQueueFrontier
+
+# The list-based QueueFrontier is quadratic, so only time it on small graphs
+MAX_PEOPLE_FOR_LIST_FRONTIER = 5000
+
+# Timings recorded for each scale, in the order they are reported
+TIMINGS = [
+    "load", "neighbors", "bfs", "bidirectional", "bfs_list_frontier",
+    "load_compact", "neighbors_compact", "bfs_compact",
+    "landmark_build", "bfs_expanded", "alt", "alt_expanded"
+]
+
+
+def time_search(frontier_class, queries, bidirectional=False):
+    """
+    Times `degrees.shortest_path` over `queries` (a list of
+    (source, target) pairs) using frontiers of type `frontier_class`,
+    or the bidirectional search if `bidirectional` is true.
+    Returns the elapsed time in seconds and the path lengths found.
+    """
+    original = degrees.HashedQueueFrontier
+    degrees.HashedQueueFrontier = frontier_class
+    try:
+        start = time.perf_counter()
+        lengths = []
+        for source, target in queries:
+            path = degrees.shortest_path(source, target, bidirectional)
+            lengths.append(None if path is None else len(path))
+        return time.perf_counter() - start, lengths
+    finally:
+        degrees.HashedQueueFrontier = original
+
+
+def time_neighbors(person_ids):
+    """
+    Returns the mean time in seconds of one `neighbors_for_person` call
+    over `person_ids`.
+    """
+    start = time.perf_counter()
+    for person_id in person_ids:
+        degrees.neighbors_for_person(person_id)
+    return (time.perf_counter() - start) / len(person_ids)
+
+
+def time_landmarks(queries, k):
+    """
+    Builds a landmark oracle from `k` landmarks and returns the build
+    time, then the time and total people expanded answering `queries`
+    with the ALT search, along with the people expanded without landmarks.
+    """
+    start = time.perf_counter()
+    degrees.build_landmarks(k)
+    build = time.perf_counter() - start
+
+    bfs_expanded = 0
+    for source, target in queries:
+        bfs_expanded += goal_directed_path(source, target, degrees.neighbors_for_person)[1]
+
+    start = time.perf_counter()
+    alt_expanded = 0
+    for source, target in queries:
+        if degrees.separation_bounds(source, target)[0] is None:
+            continue
+        alt_expanded += goal_directed_path(source, target, degrees.neighbors_for_person,
+                                           degrees.oracle.heuristic(target))[1]
+    return build, bfs_expanded, time.perf_counter() - start, alt_expanded
+
+
+def bench_scale(num_people, num_queries, seed=0, landmarks=8):
+    """
+    Generates a synthetic database of `num_people` people and returns a
+    dictionary of timings (in seconds) for loading it, expanding
+    neighbors and answering `num_queries` random queries, and the
+    number of people expanded with and without `landmarks` landmarks.
+    """
+    num_movies = max(1, int(num_people * 0.3))
+    result = {"people": num_people, "movies": num_movies, "queries": num_queries}
+
+    with tempfile.TemporaryDirectory() as directory:
+        result["stars"] = generate(directory, num_people, num_movies, seed=seed)
+
+        rng = random.Random(seed + 1)
+        queries = [
+            (str(rng.randrange(num_people)), str(rng.randrange(num_people)))
+            for _ in range(num_queries)
+        ]
+        sample = [str(rng.randrange(num_people)) for _ in range(1000)]
+
+        # Dictionary-of-sets representation
+        result["load"] = degrees.load_data(directory)["seconds"]
+        result["neighbors"] = time_neighbors(sample)
+        result["bfs"], lengths = time_search(HashedQueueFrontier, queries)
+        result["bidirectional"], _ = time_search(HashedQueueFrontier, queries, True)
+        if num_people <= MAX_PEOPLE_FOR_LIST_FRONTIER:
+            result["bfs_list_frontier"], _ = time_search(QueueFrontier, queries)
+        connected = [length for length in lengths if length is not None]
+        result["mean_degrees"] = sum(connected) / len(connected) if connected else None
+
+        # Compact CSR representation
+        result["load_compact"] = degrees.load_data(directory, compact=True)["seconds"]
+        result["neighbors_compact"] = time_neighbors(sample)
+        result["bfs_compact"], _ = time_search(HashedQueueFrontier, queries)
+
+        # Landmark-guided (ALT) search
+        if landmarks:
+            (result["landmark_build"], result["bfs_expanded"],
+             result["alt"], result["alt_expanded"]) = time_landmarks(queries, landmarks)
+
+    return result
+
+
+def compare(results, baseline):
+    """
+    Prints the ratio of each timing in `results` to the same timing
+    in `baseline` (both in the JSON format written by `main`).
+    """
+    previous = {entry["people"]: entry for entry in baseline["results"]}
+    for entry in results["results"]:
+        old = previous.get(entry["people"])
+        if old is None:
+            continue
+        print(f"{entry['people']} people (new / baseline):")
+        for key in TIMINGS:
+            if key in entry and key in old and old[key]:
+                print(f"  {key}: {entry[key] / old[key]:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading and searching synthetic cast databases."
+    )
+    parser.add_argument("--scales", default="1000,10000,100000",
+                        help="comma-separated numbers of people to test")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--landmarks", type=int, default=8,
+                        help="number of landmarks for the ALT search (0 to skip)")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="file to write the JSON results to")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="earlier results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": []
+    }
+    for scale in [int(scale) for scale in args.scales.split(",")]:
+        result = bench_scale(scale, args.queries, args.seed, args.landmarks)
+        results["results"].append(result)
+        print(f"{scale} people: " + ", ".join(
+            f"{key} {result[key]:.4g}{'' if key.endswith('expanded') else 's'}"
+            for key in TIMINGS if key in result
+        ))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
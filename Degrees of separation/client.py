@@ -0,0 +1,72 @@
+import argparse
+import json
+import sys
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+
+def query(port, source, target, bidirectional=False):
+    """
+    Asks the server on `port` for the path between `source` and `target`.
+    Returns the (status, response) pair.
+    """
+    params = {"source": source, "target": target}
+    if bidirectional:
+        params["bidirectional"] = "1"
+    url = f"http://127.0.0.1:{port}/path?{urlencode(params)}"
+    try:
+        with urlopen(url) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query a running degrees-of-separation server."
+    )
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--bidirectional", action="store_true")
+    args = parser.parse_args()
+
+    source, target = args.source, args.target
+    while True:
+        status, response = query(args.port, source, target, args.bidirectional)
+        if status != 300:
+            break
+
+        # Ask which person was meant, then retry with their id
+        print(f"Which '{response['name']}'?")
+        for candidate in response["candidates"]:
+            print(f"ID: {candidate['id']}, Name: {candidate['name']}, "
+                  f"Birth: {candidate['birth']}")
+        person_id = input("Intended Person ID: ")
+        if person_id not in [candidate["id"] for candidate in response["candidates"]]:
+            sys.exit("Person not found.")
+        if response["field"] == "source":
+            source = person_id
+        else:
+            target = person_id
+
+    if status == 404 and response.get("error") == "not found":
+        if response.get("suggestions"):
+            print(f"Did you mean: {', '.join(response['suggestions'])}?")
+        sys.exit("Person not found.")
+    elif status != 200:
+        sys.exit(f"Error: {response.get('error')}")
+
+    if response["path"] is None:
+        print("Not connected.")
+    else:
+        print(f"{response['degrees']} degrees of separation.")
+        previous = response["source_name"]
+        for i, step in enumerate(response["path"]):
+            print(f"{i + 1}: {previous} and {step['name']} starred in {step['title']}")
+            previous = step["name"]
+
+
+if __name__ == "__main__":
+    main()
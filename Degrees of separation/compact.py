@@ -0,0 +1,277 @@
+from array import array
+
+
+class CompactGraph():
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_stars):
+        """
+        Bipartite person/movie graph stored as two CSR adjacency arrays.
+
+        People and movies are interned to integer indices:
+            - `person_ids[i]` / `movie_ids[j]`: the IMDB id for index i / j
+            - `person_movies[person_offsets[i]:person_offsets[i + 1]]`:
+              indices of the movies person i starred in
+            - `movie_stars[movie_offsets[j]:movie_offsets[j + 1]]`:
+              indices of the people who starred in movie j
+
+        The offset and index sequences may be `array`s or any other
+        integer sequence (e.g. a memoryview or NumPy array); they are never
+        modified. Links added or removed later are kept in an overlay:
+            - `added_movies` / `added_stars`: links added per person / movie
+            - `removed`: set of (person, movie) links removed from the arrays
+        """
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = None
+        self.added_movies = dict()
+        self.added_stars = dict()
+        self.removed = set()
+
+    @classmethod
+    def from_links(cls, person_ids, movie_ids, link_people, link_movies):
+        """
+        CompactGraph.from_links(person_ids, movie_ids, link_people, link_movies)
+        builds a compact graph from parallel integer sequences of
+        (person index, movie index) links, without any intermediate sets.
+        """
+        person_offsets, person_movies = csr(link_people, link_movies, len(person_ids))
+        movie_offsets, movie_stars = csr(link_movies, link_people, len(movie_ids))
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies,
+                   movie_offsets, movie_stars)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at index `person` (including the person).
+        """
+        if self.added_movies or self.removed or person + 1 >= len(self.person_offsets):
+            for movie in self.movies_of(person):
+                for star in self.stars_of(movie):
+                    yield movie, star
+            return
+
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for l in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[l]
+
+    def pair_count(self, person):
+        """
+        Returns the number of (movie, person) pairs `neighbors` yields for
+        the person at index `person`, from the cast sizes alone.
+        """
+        if self.added_movies or self.removed or person + 1 >= len(self.person_offsets):
+            return sum(len(self.stars_of(movie)) for movie in self.movies_of(person))
+        movie_offsets = self.movie_offsets
+        return sum(
+            movie_offsets[movie + 1] - movie_offsets[movie]
+            for movie in self.person_movies[self.person_offsets[person]:
+                                            self.person_offsets[person + 1]]
+        )
+
+    def movies_of(self, person):
+        """
+        Returns the indices of the movies the person at index `person`
+        starred in, taking added and removed links into account.
+        """
+        movies = []
+        if person + 1 < len(self.person_offsets):
+            for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+                movie = self.person_movies[k]
+                if (person, movie) not in self.removed:
+                    movies.append(movie)
+        movies.extend(self.added_movies.get(person, ()))
+        return movies
+
+    def stars_of(self, movie):
+        """
+        Returns the indices of the people who starred in the movie at
+        index `movie`, taking added and removed links into account.
+        """
+        stars = []
+        if movie + 1 < len(self.movie_offsets):
+            for l in range(self.movie_offsets[movie], self.movie_offsets[movie + 1]):
+                star = self.movie_stars[l]
+                if (star, movie) not in self.removed:
+                    stars.append(star)
+        stars.extend(self.added_stars.get(movie, ()))
+        return stars
+
+    def add_person(self, person_id):
+        """
+        Interns a new person id and returns its index.
+        """
+        if person_id not in self.person_index:
+            self.person_index[person_id] = len(self.person_ids)
+            self.person_ids.append(person_id)
+        return self.person_index[person_id]
+
+    def find_movie(self, movie_id):
+        """
+        Returns the index of a movie id without interning it
+        (KeyError if the movie is not in the graph).
+        """
+        if self.movie_index is None:
+            self.movie_index = {movie_id: j for j, movie_id in enumerate(self.movie_ids)}
+        return self.movie_index[movie_id]
+
+    def add_movie(self, movie_id):
+        """
+        Interns a new movie id and returns its index.
+        """
+        try:
+            return self.find_movie(movie_id)
+        except KeyError:
+            self.movie_index[movie_id] = len(self.movie_ids)
+            self.movie_ids.append(movie_id)
+            return self.movie_index[movie_id]
+
+    def remove_movie(self, movie_id):
+        """
+        Removes a movie and its links. Its index is left unused until
+        `rebuilt`, and adding the movie again interns a new index.
+        """
+        movie = self.find_movie(movie_id)
+        for star in self.stars_of(movie):
+            self.remove_link(self.person_ids[star], movie_id)
+        del self.movie_index[movie_id]
+
+    def add_link(self, person_id, movie_id):
+        """
+        Records that a person starred in a movie (interning either id if new).
+        """
+        person = self.add_person(person_id)
+        movie = self.add_movie(movie_id)
+        if movie in self.movies_of(person):
+            return
+        if (person, movie) in self.removed:
+            self.removed.discard((person, movie))
+        else:
+            self.added_movies.setdefault(person, []).append(movie)
+            self.added_stars.setdefault(movie, []).append(person)
+
+    def remove_link(self, person_id, movie_id):
+        """
+        Removes the link between a person and a movie, if there is one.
+        """
+        person = self.person_index[person_id]
+        movie = self.find_movie(movie_id)
+        if movie in self.added_movies.get(person, ()):
+            self.added_movies[person].remove(movie)
+            self.added_stars[movie].remove(person)
+            if not self.added_movies[person]:
+                del self.added_movies[person]
+            if not self.added_stars[movie]:
+                del self.added_stars[movie]
+        elif movie in self.movies_of(person):
+            self.removed.add((person, movie))
+
+    def rebuilt(self):
+        """
+        Returns a new CompactGraph with the overlay folded into fresh arrays
+        and the indices of removed movies reused.
+        """
+        if self.movie_index is None:
+            movie_ids = list(self.movie_ids)
+        else:
+            movie_ids = list(self.movie_index)
+        renumber = {self.find_movie(movie_id): j for j, movie_id in enumerate(movie_ids)}
+
+        link_people = array("i")
+        link_movies = array("i")
+        for person in range(len(self.person_ids)):
+            for movie in self.movies_of(person):
+                link_people.append(person)
+                link_movies.append(renumber[movie])
+        return CompactGraph.from_links(list(self.person_ids), movie_ids,
+                                       link_people, link_movies)
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return set(
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in self.neighbors(self.person_index[person_id])
+        )
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, searching breadth-first
+        over the integer arrays.
+
+        If no possible path, returns None.
+        """
+        start = self.person_index[source]
+        goal = self.person_index[target]
+        if start == goal:
+            return []
+
+        # Parent person and connecting movie for each reached person (-1 if unreached)
+        parent = array("i", [-1]) * len(self.person_ids)
+        via = array("i", [-1]) * len(self.person_ids)
+        parent[start] = start
+
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for person in frontier:
+                for movie, neighbor in self.neighbors(person):
+                    if parent[neighbor] != -1:
+                        continue
+                    parent[neighbor] = person
+                    via[neighbor] = movie
+                    if neighbor == goal:
+                        return self._path(parent, via, start, goal)
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        return None
+
+    def _path(self, parent, via, start, goal):
+        """
+        Converts the parent/via arrays of a search into a list of
+        (movie_id, person_id) pairs from `start` to `goal`.
+        """
+        path = []
+        person = goal
+        while person != start:
+            path.append((self.movie_ids[via[person]], self.person_ids[person]))
+            person = parent[person]
+        path.reverse()
+        return path
+
+
+def csr(keys, values, size):
+    """
+    Groups `values` by the parallel integer `keys` (each below `size`)
+    with a counting sort. Returns the (offsets, indices) arrays so that
+    the values of key k are indices[offsets[k]:offsets[k + 1]].
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    indices = array("i", [0]) * len(keys)
+    position = offsets[:-1]
+    for key, value in zip(keys, values):
+        indices[position[key]] = value
+        position[key] += 1
+    return offsets, indices
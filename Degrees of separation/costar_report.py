@@ -0,0 +1,98 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import degrees
+
+
+def work_distribution():
+    """
+    Returns the share of all co-star pairs produced by the top 1% and
+    top 10% of people, ranked by the number of pairs each one expands to.
+    """
+    work = sorted(
+        (sum(len(degrees.movies[movie_id]["stars"]) for movie_id in person["movies"])
+         for person in degrees.people.values()),
+        reverse=True
+    )
+    total = sum(work) or 1
+    return {
+        "top 1%": sum(work[:max(1, len(work) // 100)]) / total,
+        "top 10%": sum(work[:max(1, len(work) // 10)]) / total
+    }
+
+
+def measure_index():
+    """
+    Returns the (seconds, bytes) it takes to build the full co-star index.
+    """
+    start = time.perf_counter()
+    degrees.build_costar_index()
+    seconds = time.perf_counter() - start
+    degrees.disable_costar_index()
+
+    tracemalloc.start()
+    degrees.build_costar_index()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, size
+
+
+def time_queries(queries):
+    """
+    Returns the total seconds taken to answer `queries`
+    with the current co-star configuration.
+    """
+    start = time.perf_counter()
+    for source, target in queries:
+        degrees.shortest_path(source, target)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report the memory/time trade-off of the co-star index."
+    )
+    parser.add_argument("directory", nargs="?", default="databases")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory)
+    person_ids = list(degrees.people)
+    print(f"{len(person_ids)} people, {len(degrees.movies)} movies")
+
+    for label, share in work_distribution().items():
+        print(f"Co-star pairs expanded by the {label} of people: {share:.1%}")
+
+    rng = random.Random(1)
+    queries = [
+        (rng.choice(person_ids), rng.choice(person_ids))
+        for _ in range(args.queries)
+    ]
+
+    seconds = time_queries(queries)
+    print(f"No index: {seconds:.3f}s for {len(queries)} queries")
+
+    for fraction in [0.01, 0.1]:
+        maxsize = max(1, int(len(person_ids) * fraction))
+        start = time.perf_counter()
+        degrees.enable_costar_cache(maxsize)
+        build_seconds = time.perf_counter() - start
+        seconds = time_queries(queries)
+        cache = degrees.costar_cache
+        hit_rate = cache.hits / max(1, cache.hits + cache.misses)
+        pair_rate = cache.hit_pairs / max(1, cache.hit_pairs + cache.miss_pairs)
+        print(f"Hub cache of {maxsize} people: {seconds:.3f}s "
+              f"({hit_rate:.1%} of calls and {pair_rate:.1%} of co-star pairs "
+              f"from the cache, hubs ranked in {build_seconds:.2f}s)")
+
+    build_seconds, size = measure_index()
+    seconds = time_queries(queries)
+    print(f"Full index: {seconds:.3f}s "
+          f"(built in {build_seconds:.2f}s, {size / 2 ** 20:.1f} MiB)")
+    degrees.disable_costar_index()
+
+
+if __name__ == "__main__":
+    main()
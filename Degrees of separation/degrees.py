@@ -1,7 +1,16 @@
+import argparse
 import csv
+import heapq
 import sys
+import time
+from array import array
+from collections import OrderedDict, deque
 
-from util import Node, StackFrontier, QueueFrontier
+from compact import CompactGraph, csr
+from landmarks import LandmarkOracle, goal_directed_path
+from nameindex import NameIndex
+from snapshot import read_snapshot, write_snapshot
+from util import Node, HashedQueueFrontier, HubCache
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,87 +21,385 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR copy of the person/movie links (None unless loaded compact)
+graph = None
 
-def load_data(directory):
+# Maps person_ids to a frozenset of co-star (movie_id, person_id) pairs
+# (None unless built with `build_costar_index`)
+costars = None
+
+# `HubCache` of the co-stars of the best-connected people (None unless enabled)
+costar_cache = None
+
+# LRU cache of BFS parent trees (see `bfs_tree`), most recently used last
+bfs_trees = OrderedDict()
+BFS_TREE_CACHE_SIZE = 8
+
+# Prefix/fuzzy index over the keys of `names` (None unless built)
+name_index = None
+
+# Landmark distance oracle (None unless built with `build_landmarks`)
+oracle = None
+
+
+def load_data(directory, compact=False, snapshot=False, min_year=None, min_cast=None,
+              index_names=False):
     """
     Load data from CSV files into memory.
+
+    The CSV files are streamed row by row. Movies released before
+    `min_year` or starring fewer than `min_cast` people are left out.
+
+    If `compact` is true, the person/movie links are stored in a
+    `CompactGraph` (in `graph`), built directly from the streamed rows,
+    and `people` and `movies` hold no `movies` / `stars` sets.
+
+    If `snapshot` is true, the data is loaded compact from a memory-mapped
+    snapshot of `directory` when one matches the current CSV files and
+    filters; otherwise the CSV files are parsed and a new snapshot is written.
+
+    If `index_names` is true, a `NameIndex` of all names is built
+    (in `name_index`) for prefix and fuzzy name lookups.
+
+    Returns a dictionary with the `source` ("csv" or "snapshot") the data
+    was loaded from, the load time in `seconds`, the time the CSV load
+    took (`csv_seconds`), the `filters` used and the number of rows
+    `skipped` for each reason.
     """
+    global graph, name_index, oracle
+    graph = None
+    name_index = None
+    oracle = None
+    disable_costar_index()
+    bfs_trees.clear()
+    names.clear()
+    people.clear()
+    movies.clear()
+    start = time.perf_counter()
+    filters = {"min_year": min_year, "min_cast": min_cast}
+
+    if snapshot:
+        cached = read_snapshot(directory, filters)
+        if cached is not None:
+            graph, cached_people, cached_movies, info = cached
+            people.update(cached_people)
+            movies.update(cached_movies)
+            for person_id, person in cached_people.items():
+                names.setdefault(person["name"].lower(), set()).add(person_id)
+            if index_names:
+                build_name_index()
+            return dict(info, source="snapshot", seconds=time.perf_counter() - start)
+
+    compact = compact or snapshot
+    skipped = {
+        "people": 0,
+        "movies": 0,
+        "movies_by_year": 0,
+        "movies_by_cast": 0,
+        "stars": 0,
+        "stars_duplicate": 0,
+        "stars_unknown_person": 0,
+        "stars_unknown_movie": 0,
+        "stars_excluded_movie": 0
+    }
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+    for row in read_rows(f"{directory}/people.csv", ["id", "name", "birth"]):
+        if row is None or not row[0] or row[0] in people:
+            skipped["people"] += 1
+            continue
+        person_id = sys.intern(row[0])
+        people[person_id] = {"name": row[1], "birth": row[2]}
+        if not compact:
+            people[person_id]["movies"] = set()
+        names.setdefault(row[1].lower(), set()).add(person_id)
+
+    # Load movies, remembering the ids of those left out by year
+    excluded = set()
+    for row in read_rows(f"{directory}/movies.csv", ["id", "title", "year"]):
+        if row is None or not row[0] or row[0] in movies:
+            skipped["movies"] += 1
+            continue
+        if min_year is not None and not year_at_least(row[2], min_year):
+            skipped["movies_by_year"] += 1
+            excluded.add(row[0])
+            continue
+        movie_id = sys.intern(row[0])
+        movies[movie_id] = {"title": row[1], "year": row[2]}
+        if not compact:
+            movies[movie_id]["stars"] = set()
+
+    # Load stars, either into the link sets or into flat link arrays
+    if compact:
+        person_index = {person_id: i for i, person_id in enumerate(people)}
+        movie_index = {movie_id: j for j, movie_id in enumerate(movies)}
+        link_people = array("i")
+        link_movies = array("i")
+    for row in read_rows(f"{directory}/stars.csv", ["person_id", "movie_id"]):
+        if row is None:
+            skipped["stars"] += 1
+        elif row[0] not in people:
+            skipped["stars_unknown_person"] += 1
+        elif row[1] in excluded:
+            skipped["stars_excluded_movie"] += 1
+        elif row[1] not in movies:
+            skipped["stars_unknown_movie"] += 1
+        elif compact:
+            link_people.append(person_index[row[0]])
+            link_movies.append(movie_index[row[1]])
+        elif row[1] in people[row[0]]["movies"]:
+            skipped["stars_duplicate"] += 1
+        else:
+            person_id = sys.intern(row[0])
+            movie_id = sys.intern(row[1])
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+
+    # Drop repeated links, then movies with too small a cast along with their links
+    if compact:
+        link_people, link_movies = drop_duplicate_links(link_people, link_movies, len(movies),
+                                                        skipped)
+        if min_cast is not None:
+            link_people, link_movies = drop_small_casts(link_people, link_movies, min_cast, skipped)
+        graph = CompactGraph.from_links(list(people), list(movies), link_people, link_movies)
+    elif min_cast is not None:
+        for movie_id in [m for m in movies if len(movies[m]["stars"]) < min_cast]:
+            for person_id in movies[movie_id]["stars"]:
+                people[person_id]["movies"].discard(movie_id)
+            skipped["movies_by_cast"] += 1
+            skipped["stars_excluded_movie"] += len(movies[movie_id]["stars"])
+            del movies[movie_id]
+
+    seconds = time.perf_counter() - start
+    info = {"csv_seconds": seconds, "filters": filters, "skipped": skipped}
+
+    if snapshot:
+        try:
+            write_snapshot(directory, graph, people, movies, info)
+        except OSError:
+            pass
+
+    if index_names:
+        build_name_index()
+    return dict(info, source="csv", seconds=seconds)
+
+
+def read_rows(filename, fields):
+    """
+    Yields a tuple of the `fields` columns for each row of a CSV file,
+    or None for rows that are missing any of them.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = [header.index(field) for field in fields]
         for row in reader:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+                yield tuple(row[column] for column in columns)
+            except IndexError:
+                yield None
+
+
+def year_at_least(year, min_year):
+    """
+    Returns True if the `year` field of a movie is a year no earlier
+    than `min_year` (movies without a valid year are left out).
+    """
+    try:
+        return int(year) >= min_year
+    except ValueError:
+        return False
+
+
+def drop_duplicate_links(link_people, link_movies, num_movies, skipped):
+    """
+    Removes repeated (person, movie) links from the flat link arrays,
+    counting them in `skipped`, and returns the filtered
+    (link_people, link_movies) arrays (grouped by movie if any were
+    repeated). Each movie's cast is checked on its own, so only one
+    small set is held at a time.
+    """
+    offsets, stars = csr(link_movies, link_people, num_movies)
+    kept_people = array("i")
+    kept_movies = array("i")
+    for movie in range(num_movies):
+        cast = dict.fromkeys(stars[offsets[movie]:offsets[movie + 1]])
+        kept_people.extend(cast)
+        kept_movies.extend([movie] * len(cast))
+    skipped["stars_duplicate"] += len(link_people) - len(kept_people)
+    if len(kept_people) == len(link_people):
+        return link_people, link_movies
+    return kept_people, kept_movies
+
+
+def drop_small_casts(link_people, link_movies, min_cast, skipped):
+    """
+    Removes the movies starring fewer than `min_cast` people from
+    `movies` and the flat link arrays, renumbering the remaining movies.
+    Returns the filtered (link_people, link_movies) arrays.
+    """
+    movie_ids = list(movies)
+    cast = array("i", [0]) * len(movie_ids)
+    for movie in link_movies:
+        cast[movie] += 1
+
+    # Map old movie indices to new ones (-1 for dropped movies)
+    renumber = array("i", [-1]) * len(movie_ids)
+    kept = 0
+    for j, movie_id in enumerate(movie_ids):
+        if cast[j] < min_cast:
+            skipped["movies_by_cast"] += 1
+            skipped["stars_excluded_movie"] += cast[j]
+            del movies[movie_id]
+        else:
+            renumber[j] = kept
+            kept += 1
+
+    kept_people = array("i")
+    kept_movies = array("i")
+    for person, movie in zip(link_people, link_movies):
+        if renumber[movie] != -1:
+            kept_people.append(person)
+            kept_movies.append(renumber[movie])
+    return kept_people, kept_movies
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "databases"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people."
+    )
+    parser.add_argument("directory", nargs="?", default="databases")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people and meet in the middle")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the cast graph as integer CSR arrays")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from (or create) a memory-mapped snapshot "
+                             "instead of parsing the CSV files (implies --compact)")
+    parser.add_argument("--min-year", type=int,
+                        help="leave out movies released before this year")
+    parser.add_argument("--min-cast", type=int,
+                        help="leave out movies starring fewer people than this")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="index names to suggest matches for mistyped names")
+    parser.add_argument("--all", action="store_true",
+                        help="list every shortest path instead of one")
+    parser.add_argument("--k", type=int,
+                        help="list the K shortest paths with the most recent movies")
+    parser.add_argument("--landmarks", type=int, metavar="K",
+                        help="precompute distances from K landmark people, "
+                             "then estimate and search with them")
+    parser.add_argument("--histogram", action="store_true",
+                        help="report how many people are at each distance "
+                             "from one person instead of finding a path")
+    parser.add_argument("--costar-index", action="store_true",
+                        help="precompute every person's co-stars after loading")
+    parser.add_argument("--costar-cache", type=int, metavar="SIZE",
+                        help="cache the co-stars of the SIZE people with the "
+                             "most co-stars")
+    args = parser.parse_args()
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    info = load_data(directory, compact=args.compact, snapshot=args.snapshot,
+                     min_year=args.min_year, min_cast=args.min_cast,
+                     index_names=args.fuzzy)
+    if info["source"] == "snapshot":
+        print(f"Data loaded from snapshot in {info['seconds']:.2f}s "
+              f"(CSV load took {info['csv_seconds']:.2f}s).")
+    else:
+        print(f"Data loaded in {info['seconds']:.2f}s.")
+    skipped = {reason: count for reason, count in info["skipped"].items() if count}
+    if skipped:
+        print(f"Skipped rows: {skipped}")
+
+    if args.costar_index:
+        build_costar_index()
+    elif args.costar_cache:
+        enable_costar_cache(args.costar_cache)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
+
+    if args.histogram:
+        histogram = distance_histogram(source)
+        for distance in sorted(histogram):
+            print(f"{distance} degrees of separation: {histogram[distance]} people")
+        print(f"Not connected: {len(people) - sum(histogram.values())} people")
+        return
+
     target = person_id_for_name(input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.all or args.k:
+        if args.all:
+            paths = all_shortest_paths(source, target)
+        else:
+            paths = k_shortest_paths(source, target, args.k)
+        count = 0
+        for count, path in enumerate(paths, 1):
+            print(f"Path {count}:")
+            print_path(source, path)
+        if count == 0:
+            print("Not connected.")
+        return
+
+    if args.landmarks:
+        build_landmarks(args.landmarks)
+        lower, upper = separation_bounds(source, target)
+        if lower is None:
+            print("Not connected.")
+            return
+        print(f"Estimate: at least {lower} and at most "
+              f"{'?' if upper is None else upper} degrees of separation.")
+        path = landmark_shortest_path(source, target)
+    else:
+        path = shortest_path(source, target, bidirectional=args.bidirectional)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    """
+    Prints the degrees of separation and each step of a path
+    of (movie_id, person_id) pairs starting from `source`.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If `bidirectional` is true, the search is delegated to
+    `bidirectional_shortest_path`; otherwise a plain breadth-first
+    search from the source is used (the reference implementation),
+    running directly on the CSR arrays when `graph` is loaded.
+
     If no possible path, returns None.
     """
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
+    if graph is not None:
+        return graph.shortest_path(source, target)
+
     # Initialize frontier to just the starting position
     start = Node(person=source, connection=None, movie=None)
-    frontier = QueueFrontier()
+    frontier = HashedQueueFrontier()
     frontier.add(start)
 
     # Initialize an empty explored set
@@ -131,37 +438,491 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bfs_tree(source):
+    """
+    Returns the breadth-first parent tree of `source`: a dictionary
+    mapping every person connected to the source to the
+    (movie_id, person_id) step towards the source (None for the source),
+    in breadth-first order.
+
+    The `BFS_TREE_CACHE_SIZE` most recently used trees are cached.
+    """
+    if source in bfs_trees:
+        bfs_trees.move_to_end(source)
+        return bfs_trees[source]
+
+    tree = {source: None}
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id not in tree:
+                tree[neighbor_id] = (movie_id, person_id)
+                frontier.append(neighbor_id)
+
+    bfs_trees[source] = tree
+    while len(bfs_trees) > BFS_TREE_CACHE_SIZE:
+        bfs_trees.popitem(last=False)
+    return tree
+
+
+def path_from_tree(tree, target):
+    """
+    Returns the list of (movie_id, person_id) pairs that connect the
+    root of a `bfs_tree` to the target, or None if they are not connected.
+    """
+    if target not in tree:
+        return None
+    path = []
+    person_id = target
+    while tree[person_id] is not None:
+        movie_id, parent_id = tree[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+    return path
+
+
+def cached_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target by walking the cached
+    breadth-first tree of the source.
+
+    If no possible path, returns None.
+    """
+    return path_from_tree(bfs_tree(source), target)
+
+
+def distance_histogram(source):
+    """
+    Returns a dictionary mapping each degree of separation from `source`
+    to the number of people at exactly that distance.
+    """
+    tree = bfs_tree(source)
+    distance = dict()
+    histogram = dict()
+
+    # The tree is in breadth-first order, so parents precede their children
+    for person_id, step in tree.items():
+        distance[person_id] = 0 if step is None else distance[step[1]] + 1
+        histogram[distance[person_id]] = histogram.get(distance[person_id], 0) + 1
+    return histogram
+
+
+def shortest_path_dag(source, target):
+    """
+    Runs a layered breadth-first search from `source` that stops after
+    the layer containing `target`, and returns a dictionary mapping
+    each person reached to the list of every (movie_id, person_id)
+    predecessor one layer closer to the source. Together these form a
+    DAG of all shortest paths. Returns None if no path exists.
+    """
+    predecessors = {source: []}
+    layer = [source]
+    while layer and target not in predecessors:
+        next_layer = dict()
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in predecessors:
+                    continue
+                next_layer.setdefault(neighbor_id, []).append((movie_id, person_id))
+        predecessors.update(next_layer)
+        layer = list(next_layer)
+    if target not in predecessors:
+        return None
+    return predecessors
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, one at a time, by walking the
+    `shortest_path_dag` back from the target. Only the DAG and the
+    current path are held in memory, however many paths there are.
+    """
+    predecessors = shortest_path_dag(source, target)
+    if predecessors is None:
+        return
+    yield from dag_paths(predecessors, source, target)
+
+
+def dag_paths(predecessors, source, target, years=None, min_year=None):
+    """
+    Yields the paths from the source to the target in a
+    `shortest_path_dag`. If `min_year` is given, only paths whose movies
+    all have a year (looked up in `years`) of at least `min_year` are
+    yielded, and branches without such a path are never entered.
+    """
+    if source == target:
+        yield []
+        return
+    if min_year is None:
+        counts = None
+    else:
+        counts = dag_path_counts(predecessors, source, years, min_year)
+        if not counts[target]:
+            return
+
+    # Depth-first walk from the target: stack[i] iterates the predecessors
+    # of current[i], and path holds the steps taken so far (target first)
+    path = []
+    current = [target]
+    stack = [iter(predecessors[target])]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            current.pop()
+            if path:
+                path.pop()
+            continue
+        movie_id, parent_id = step
+        if counts is not None and (years[movie_id] < min_year or not counts[parent_id]):
+            continue
+        path.append((movie_id, current[-1]))
+        if parent_id == source:
+            yield list(reversed(path))
+            path.pop()
+        else:
+            current.append(parent_id)
+            stack.append(iter(predecessors[parent_id]))
+
+
+def dag_path_counts(predecessors, source, years=None, min_year=None):
+    """
+    Returns a dictionary mapping each person in a `shortest_path_dag` to
+    the number of shortest paths from the source to them, only counting
+    movies with a year (looked up in `years`) of at least `min_year` if
+    it is given.
+    """
+    counts = {source: 1}
+
+    # Predecessor lists are in layer order, so parents are counted first
+    for person_id, steps in predecessors.items():
+        if steps:
+            counts[person_id] = sum(
+                counts[parent_id] for movie_id, parent_id in steps
+                if min_year is None or years[movie_id] >= min_year
+            )
+    return counts
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns the number of distinct shortest paths between the source
+    and the target without enumerating them (0 if not connected).
+    """
+    predecessors = shortest_path_dag(source, target)
+    if predecessors is None:
+        return 0
+    return dag_path_counts(predecessors, source)[target]
+
+
+def movie_year(movie_id):
+    """
+    Returns the year of a movie as an integer, or 0 if it has no valid
+    year (like `year_at_least`, IMDB's "\\N" is not a year).
+    """
+    try:
+        return int(movies[movie_id]["year"])
+    except ValueError:
+        return 0
+
+
+def path_recency(path):
+    """
+    Sort key ranking paths with more recent movies first: by the year of
+    the oldest movie in the path, then by the sum of the movie years
+    (movies without a valid year count as year 0).
+    """
+    years = [movie_year(movie_id) for movie_id, _ in path]
+    return (-min(years, default=0), -sum(years))
+
+
+def k_shortest_paths(source, target, k, key=path_recency):
+    """
+    Returns up to `k` of the shortest paths between the source and the
+    target, ranked by `key` (most recent movies first by default).
+
+    The default ranking is computed on the `shortest_path_dag` without
+    enumerating every path: counting paths finds the latest year Y such
+    that at least `k` paths use only movies from Y on, the fewer than
+    `k` paths using only movies after Y are enumerated, and the `k`
+    paths from Y on with the largest sum of years are found by keeping
+    the `k` best partial paths at each person. That takes O(DAG size * (log(years)
+    + k)) time, however many shortest paths there are.
+
+    Any other `key` streams every path from `all_shortest_paths`,
+    keeping only `k`, which can take very long between hubs.
+    """
+    if k <= 0:
+        return []
+    if key is not path_recency:
+        return heapq.nsmallest(k, all_shortest_paths(source, target), key=key)
+    predecessors = shortest_path_dag(source, target)
+    if predecessors is None:
+        return []
+    if source == target:
+        return [[]]
+
+    # Binary search for the latest year with at least `k` paths from then on
+    years = dict()
+    for steps in predecessors.values():
+        for movie_id, _ in steps:
+            if movie_id not in years:
+                years[movie_id] = movie_year(movie_id)
+    thresholds = sorted(set(years.values()), reverse=True)
+    low, high = 0, len(thresholds) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if dag_path_counts(predecessors, source, years, thresholds[middle])[target] >= k:
+            high = middle
+        else:
+            low = middle + 1
+    min_year = thresholds[low]
+
+    # The few paths using only later movies are all candidates
+    candidates = []
+    if low > 0:
+        candidates.extend(dag_paths(predecessors, source, target, years, thresholds[low - 1]))
+
+    # Keep the `k` partial paths with the largest sum of years at each person;
+    # a partial path is a linked list of (step, previous) pairs
+    best = {source: [(0, None)]}
+    for person_id, steps in predecessors.items():
+        if not steps:
+            continue
+        extended = [
+            (total + years[movie_id], ((movie_id, person_id), partial))
+            for movie_id, parent_id in steps if years[movie_id] >= min_year
+            for total, partial in best[parent_id]
+        ]
+        best[person_id] = heapq.nlargest(k, extended, key=lambda entry: entry[0])
+    for _, partial in best[target]:
+        path = []
+        while partial is not None:
+            step, partial = partial
+            path.append(step)
+        candidates.append(list(reversed(path)))
+
+    # The partial paths may find some of the later-only paths again
+    unique = {tuple(path): path for path in candidates}
+    return heapq.nsmallest(k, unique.values(), key=key)
+
+
+def build_landmarks(k=8, strategy="farthest"):
+    """
+    Builds the landmark distance `oracle` from `k` landmark people.
+    """
+    global oracle
+    oracle = LandmarkOracle.build(people, neighbors_for_person, k, strategy)
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    the source and the target from the landmark `oracle`, without any
+    search. `upper` is None if unknown; `lower` is None if they are
+    certainly not connected.
+    """
+    if oracle is None:
+        raise Exception("No landmark oracle: call build_landmarks() after loading or updating")
+    return oracle.bounds(source, target)
+
+
+def landmark_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs that connect
+    the source to the target, using an A* search guided by the landmark
+    `oracle` (ALT) so that far fewer people are expanded than by BFS.
+
+    If no possible path, returns None.
+    """
+    lower, _ = separation_bounds(source, target)
+    if lower is None:
+        return None
+    path, _ = goal_directed_path(source, target, neighbors_for_person,
+                                 oracle.heuristic(target))
+    return path
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing breadth-first
+    frontiers from both ends and stopping once they meet.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to (movie_id, person_id) of the step
+    # towards the source (forward) or towards the target (backward)
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Expand the smaller frontier by one full level
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, depth = forward_frontier, forward, forward_depth
+            other_depth = backward_depth
+        else:
+            frontier, parents, depth = backward_frontier, backward, backward_depth
+            other_depth = forward_depth
+
+        next_frontier = []
+        best = None
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                depth[neighbor_id] = depth[person_id] + 1
+                next_frontier.append(neighbor_id)
+
+                # Keep the shortest meeting point found on this level
+                if neighbor_id in other_depth:
+                    length = depth[neighbor_id] + other_depth[neighbor_id]
+                    if best is None or length < best[0]:
+                        best = (length, neighbor_id)
+
+        if best is not None:
+            return _join_paths(forward, backward, best[1])
+
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Builds the (movie_id, person_id) path through `meeting` from the
+    forward and backward parent maps of a bidirectional search.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, child_id = backward[person_id]
+        path.append((movie_id, child_id))
+        person_id = child_id
+    return path
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
+    candidates = candidates_for_name(name)
+    if len(candidates) == 0:
+        suggestions = suggest_names(name)
+        if not suggestions:
+            return None
+
+        # Offer the closest names from the name index instead
+        print(f"No exact match for '{name}'. Did you mean:")
+        for i, suggestion in enumerate(suggestions):
+            print(f"{i + 1}: {suggestion}")
+        try:
+            choice = int(input("Intended name (number): "))
+            if 1 <= choice <= len(suggestions):
+                return person_id_for_name(suggestions[choice - 1])
+        except ValueError:
+            pass
         return None
-    elif len(person_ids) > 1:
+    elif len(candidates) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        for candidate in candidates:
+            print(f"ID: {candidate['id']}, Name: {candidate['name']}, "
+                  f"Birth: {candidate['birth']}")
         try:
             person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
+            if any(candidate["id"] == person_id for candidate in candidates):
                 return person_id
         except ValueError:
             pass
         return None
     else:
-        return person_ids[0]
+        return candidates[0]["id"]
+
+
+def build_name_index():
+    """
+    Builds the prefix/fuzzy `name_index` over the names in `names`.
+    """
+    global name_index
+    name_index = NameIndex(names)
+
+
+def suggest_names(name, limit=5):
+    """
+    Returns up to `limit` names (as spelled in `people`) ranked by how
+    closely they match `name`, or an empty list if there is no name index.
+    """
+    if name_index is None:
+        return []
+    suggestions = []
+    for key, _ in name_index.search(name, limit):
+        person_id = min(names[key])
+        suggestions.append(people[person_id]["name"])
+    return suggestions
+
+
+def candidates_for_name(name):
+    """
+    Returns a list of dictionaries of: id, name, birth
+    for every person matching `name`, ordered by id.
+    """
+    return [
+        {
+            "id": person_id,
+            "name": people[person_id]["name"],
+            "birth": people[person_id]["birth"]
+        }
+        for person_id in sorted(names.get(name.lower(), set()))
+    ]
 
 
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    Uses the co-star index or hub cache when one has been enabled, in
+    which case the returned set may be a shared frozenset.
+    """
+    if costars is not None:
+        return costars[person_id]
+    if costar_cache is not None:
+        return costar_cache(person_id)
+    return _neighbors_for_person(person_id)
+
+
+def _neighbors_for_person(person_id):
+    """
+    Computes the (movie_id, person_id) co-star pairs of a person
+    from `graph` or the `people` / `movies` link sets.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -170,5 +931,180 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def build_costar_index():
+    """
+    Precomputes the co-star pairs of every person into `costars`,
+    trading memory for O(1) `neighbors_for_person` calls.
+    """
+    global costars, costar_cache
+    costar_cache = None
+    costars = {
+        person_id: frozenset(_neighbors_for_person(person_id))
+        for person_id in people
+    }
+
+
+def enable_costar_cache(maxsize=10000):
+    """
+    Caches the co-star pairs of the `maxsize` people with the most
+    co-star pairs (ranked from cast sizes, without building the pairs),
+    the hub actors that account for most of the work of every search,
+    without indexing everyone.
+    """
+    global costars, costar_cache
+    costars = None
+    hubs = heapq.nlargest(maxsize, people, key=costar_pair_count)
+    costar_cache = HubCache(_neighbors_for_person, set(hubs))
+
+
+def costar_pair_count(person_id):
+    """
+    Returns the number of (movie_id, person_id) pairs
+    `neighbors_for_person` returns for a person, from cast sizes alone.
+    """
+    if graph is not None:
+        return graph.pair_count(graph.person_index[person_id])
+    return sum(len(movies[movie_id]["stars"]) for movie_id in people[person_id]["movies"])
+
+
+def disable_costar_index():
+    """
+    Drops the co-star index and cache so neighbors are computed on demand.
+    """
+    global costars, costar_cache
+    costars = None
+    costar_cache = None
+
+
+def add_person(person_id, name, birth=""):
+    """
+    Adds a new person (without any movies) to the loaded data, with an
+    empty co-star index entry. The landmark oracle is dropped, as it
+    has no distances for the new person.
+    """
+    global oracle
+    if person_id in people:
+        raise Exception(f"Person {person_id} already exists")
+    people[person_id] = {"name": name, "birth": birth}
+    if graph is None:
+        people[person_id]["movies"] = set()
+    else:
+        graph.add_person(person_id)
+    names.setdefault(name.lower(), set()).add(person_id)
+    if name_index is not None:
+        name_index.add(name.lower())
+    if costars is not None:
+        costars[person_id] = frozenset()
+    oracle = None
+
+
+def add_movie(movie_id, title, year, stars=()):
+    """
+    Adds a new movie to the loaded data, starring the existing
+    people whose ids are in `stars`.
+    """
+    if movie_id in movies:
+        raise Exception(f"Movie {movie_id} already exists")
+    movies[movie_id] = {"title": title, "year": year}
+    if graph is None:
+        movies[movie_id]["stars"] = set()
+    else:
+        graph.add_movie(movie_id)
+    for person_id in stars:
+        add_star(person_id, movie_id)
+
+
+def remove_movie(movie_id):
+    """
+    Removes a movie and all of its star links from the loaded data.
+    """
+    if movie_id not in movies:
+        raise Exception(f"Unknown movie {movie_id}")
+    for person_id in stars_for_movie(movie_id):
+        remove_star(person_id, movie_id)
+    if graph is not None:
+        graph.remove_movie(movie_id)
+    del movies[movie_id]
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that an existing person starred in an existing movie,
+    updating the co-star index and BFS tree cache to match.
+    """
+    if person_id not in people or movie_id not in movies:
+        raise Exception(f"Unknown person {person_id} or movie {movie_id}")
+    cast = stars_for_movie(movie_id)
+    if person_id in cast:
+        return
+    if graph is None:
+        people[person_id]["movies"].add(movie_id)
+        movies[movie_id]["stars"].add(person_id)
+    else:
+        graph.add_link(person_id, movie_id)
+    links_changed(person_id, movie_id, cast, added=True)
+
+
+def remove_star(person_id, movie_id):
+    """
+    Removes the link between an existing person and an existing movie,
+    if any, updating the co-star index and BFS tree cache to match.
+    """
+    if person_id not in people or movie_id not in movies:
+        raise Exception(f"Unknown person {person_id} or movie {movie_id}")
+    cast = stars_for_movie(movie_id)
+    if person_id not in cast:
+        return
+    if graph is None:
+        people[person_id]["movies"].discard(movie_id)
+        movies[movie_id]["stars"].discard(person_id)
+    else:
+        graph.remove_link(person_id, movie_id)
+    links_changed(person_id, movie_id, cast - {person_id}, added=False)
+
+
+def stars_for_movie(movie_id):
+    """
+    Returns the set of ids of the people who starred in a movie.
+    """
+    if graph is None:
+        return set(movies[movie_id]["stars"])
+    return set(graph.person_ids[star] for star in graph.stars_of(graph.find_movie(movie_id)))
+
+
+def links_changed(person_id, movie_id, cast, added):
+    """
+    Updates the caches after a link between `person_id` and `movie_id`
+    was added or removed, given the rest of the movie's `cast`:
+        - co-star index entries of the person and the cast are recomputed
+          (or dropped from the hub cache, to be recomputed when next expanded)
+        - the landmark oracle is dropped, as its distances may now be wrong
+        - cached BFS trees are dropped only if the change can affect them
+    """
+    # Landmark distances may no longer be valid bounds
+    global oracle
+    oracle = None
+
+    if costars is not None:
+        for affected_id in cast | {person_id}:
+            costars[affected_id] = frozenset(_neighbors_for_person(affected_id))
+    if costar_cache is not None:
+        for affected_id in cast | {person_id}:
+            costar_cache.discard(affected_id)
+
+    for source, tree in list(bfs_trees.items()):
+        if added:
+            # New edges only matter to a tree if they touch someone it reaches
+            stale = person_id in tree or any(star in tree for star in cast)
+        else:
+            # Removing a non-tree edge leaves every tree path and distance intact
+            step = tree.get(person_id)
+            stale = (step is not None and step[0] == movie_id) or any(
+                tree.get(star) == (movie_id, person_id) for star in cast
+            )
+        if stale:
+            del bfs_trees[source]
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+import argparse
+import bisect
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael",
+    "Linda", "William", "Elizabeth", "David", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Emma",
+    "Kevin", "Tom", "Sally", "Gary", "Robin", "Demi", "Jack", "Cary", "Valeria"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Bacon", "Hanks", "Cruise", "Field", "Sinise", "Wright", "Moore", "Paxton"
+]
+
+
+def cast_size(rng, min_cast, max_cast, alpha):
+    """
+    Draws a movie cast size from a discrete power law (Pareto tail with
+    exponent `alpha`) between `min_cast` and `max_cast`.
+    """
+    size = int(min_cast * (1 - rng.random()) ** (-1 / (alpha - 1)))
+    return min(size, max_cast)
+
+
+def generate(directory, num_people, num_movies, min_cast=2, max_cast=50,
+             cast_alpha=2.5, popularity_alpha=1.0, seed=0):
+    """
+    Writes IMDB-shaped `people.csv`, `movies.csv` and `stars.csv` files
+    to `directory`.
+
+    Cast sizes follow a power law with exponent `cast_alpha`, and people
+    are cast with Zipf weights 1 / rank ** `popularity_alpha`, so a few
+    hub actors star in a large share of the movies. Names are drawn from
+    small lists, so many people share a name.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(num_people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            writer.writerow([i, name, rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for j in range(num_movies):
+            writer.writerow([j, f"Movie {j}", rng.randint(1920, 2020)])
+
+    # Cumulative Zipf weights, shuffled so that hubs are spread over the ids
+    ranks = list(range(1, num_people + 1))
+    rng.shuffle(ranks)
+    cumulative = list(itertools.accumulate(1 / rank ** popularity_alpha for rank in ranks))
+    total = cumulative[-1]
+
+    links = 0
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for j in range(num_movies):
+            size = min(cast_size(rng, min_cast, max_cast, cast_alpha), num_people)
+            stars = set()
+            while len(stars) < size:
+                stars.add(bisect.bisect_left(cumulative, rng.random() * total))
+            for person in stars:
+                writer.writerow([person, j])
+            links += size
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic IMDB-shaped cast database."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=100000)
+    parser.add_argument("--movies", type=int, default=30000)
+    parser.add_argument("--min-cast", type=int, default=2)
+    parser.add_argument("--max-cast", type=int, default=50)
+    parser.add_argument("--cast-alpha", type=float, default=2.5,
+                        help="power-law exponent of the cast size distribution")
+    parser.add_argument("--popularity-alpha", type=float, default=1.0,
+                        help="Zipf exponent of how often each person is cast")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    links = generate(args.directory, args.people, args.movies,
+                     args.min_cast, args.max_cast,
+                     args.cast_alpha, args.popularity_alpha, args.seed)
+    print(f"Wrote {args.people} people, {args.movies} movies and "
+          f"{links} stars to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import heapq
+from array import array
+from collections import deque
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkOracle():
+
+    def __init__(self, person_index, landmarks, distances):
+        """
+        Distance oracle built from breadth-first searches from a few
+        landmark people.
+            - `person_index`: maps each person_id to its position in the arrays
+            - `landmarks`: the person_ids of the landmarks
+            - `distances`: one array('B') per landmark holding the degrees of
+              separation from the landmark to every person (`UNREACHABLE` if
+              not connected)
+        """
+        self.person_index = person_index
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, person_ids, neighbors, k=8, strategy="farthest"):
+        """
+        LandmarkOracle.build(person_ids, neighbors, k, strategy) picks `k`
+        landmarks and runs a breadth-first search from each one, using
+        `neighbors(person_id)` to list (movie_id, person_id) co-stars.
+
+        With the "degree" strategy the people with the most co-stars are
+        the landmarks; with "farthest" the first landmark has the most
+        co-stars and each next one is the person farthest from those
+        already chosen, which spreads the landmarks over the graph.
+        """
+        person_ids = list(person_ids)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        degree = {person_id: len(neighbors(person_id)) for person_id in person_ids}
+        by_degree = sorted(person_ids, key=degree.get, reverse=True)
+
+        oracle = cls(person_index, [], [])
+        if strategy == "degree":
+            for landmark in by_degree[:k]:
+                oracle.add_landmark(landmark, neighbors)
+        elif strategy == "farthest":
+            # Closest landmark distance of each person, to pick the farthest next
+            closest = array("B", [UNREACHABLE]) * len(person_ids)
+            landmark = by_degree[0]
+            while len(oracle.landmarks) < min(k, len(person_ids)):
+                distances = oracle.add_landmark(landmark, neighbors)
+                for i, distance in enumerate(distances):
+                    if distance < closest[i]:
+                        closest[i] = distance
+
+                # Only people connected to the landmarks, so they are not
+                # spent on the many tiny components of the graph
+                farthest = max(
+                    (i for i in range(len(person_ids))
+                     if closest[i] != 0 and closest[i] != UNREACHABLE),
+                    key=lambda i: (closest[i], degree[person_ids[i]]),
+                    default=None
+                )
+                if farthest is None:
+                    break
+                landmark = person_ids[farthest]
+        else:
+            raise Exception(f"Unknown landmark strategy: {strategy}")
+        return oracle
+
+    def add_landmark(self, landmark, neighbors):
+        """
+        Runs a breadth-first search from `landmark` and stores its
+        distances to every person. Returns the distance array.
+        """
+        distances = array("B", [UNREACHABLE]) * len(self.person_index)
+        distances[self.person_index[landmark]] = 0
+        frontier = deque([landmark])
+        while frontier:
+            person_id = frontier.popleft()
+            distance = distances[self.person_index[person_id]] + 1
+            for _, neighbor_id in neighbors(person_id):
+                i = self.person_index[neighbor_id]
+                if distances[i] == UNREACHABLE:
+                    distances[i] = min(distance, UNREACHABLE - 1)
+                    frontier.append(neighbor_id)
+        self.landmarks.append(landmark)
+        self.distances.append(distances)
+        return distances
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        the source and the target. `upper` is None if no landmark reaches
+        both; `lower` is None if they are certainly not connected.
+        """
+        s = self.person_index[source]
+        t = self.person_index[target]
+        if s == t:
+            return 0, 0
+        lower = 1
+        upper = None
+        for distances in self.distances:
+            ds = distances[s]
+            dt = distances[t]
+            if (ds == UNREACHABLE) != (dt == UNREACHABLE):
+                return None, None
+            if ds == UNREACHABLE:
+                continue
+            lower = max(lower, abs(ds - dt))
+            if upper is None or ds + dt < upper:
+                upper = ds + dt
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function giving, for a person_id, a lower bound on its
+        degrees of separation from `target` (triangle inequality over the
+        landmarks reaching the target). The bound is consistent, so it can
+        guide an A* search without losing optimality.
+        """
+        t = self.person_index[target]
+        rows = [
+            (distances, distances[t]) for distances in self.distances
+            if distances[t] != UNREACHABLE
+        ]
+
+        def h(person_id):
+            i = self.person_index[person_id]
+            return max((abs(distances[i] - dt) for distances, dt in rows), default=0)
+        return h
+
+
+def goal_directed_path(source, target, neighbors, heuristic=None):
+    """
+    Returns a (path, expanded) pair: the shortest list of
+    (movie_id, person_id) pairs that connect the source to the target
+    (None if not connected), and the number of people expanded.
+
+    With a `heuristic` this is an A* search guided by landmark lower
+    bounds (ALT); without one, people are expanded in breadth-first order.
+    """
+    h = heuristic or (lambda person_id: 0)
+    parents = {source: None}
+    cost = {source: 0}
+    # Ties on f = g + h are broken towards deeper people (larger g)
+    heap = [(h(source), 0, source)]
+    expanded = 0
+    closed = set()
+
+    while heap:
+        _, negative_g, person_id = heapq.heappop(heap)
+        g = -negative_g
+        if person_id in closed:
+            continue
+        if person_id == target:
+            path = []
+            while parents[person_id] is not None:
+                movie_id, parent_id = parents[person_id]
+                path.append((movie_id, person_id))
+                person_id = parent_id
+            path.reverse()
+            return path, expanded
+        closed.add(person_id)
+        expanded += 1
+
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in closed:
+                continue
+            if neighbor_id not in cost or g + 1 < cost[neighbor_id]:
+                cost[neighbor_id] = g + 1
+                parents[neighbor_id] = (movie_id, person_id)
+                heapq.heappush(heap, (g + 1 + h(neighbor_id), -(g + 1), neighbor_id))
+
+    return None, expanded
@@ -0,0 +1,57 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from batch import read_queries
+from client import query
+
+
+def percentile(values, fraction):
+    """
+    Returns the `fraction` percentile of a sorted list of `values`.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-test a running degrees-of-separation server."
+    )
+    parser.add_argument("queries",
+                        help="file of tab-separated source/target names or ids")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--clients", type=int, default=8,
+                        help="number of concurrent clients")
+    parser.add_argument("--bidirectional", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = list(read_queries(f, args.bidirectional))
+
+    def timed_query(pair):
+        source, target, bidirectional = pair
+        start = time.perf_counter()
+        status, _ = query(args.port, source, target, bidirectional)
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as executor:
+        results = list(executor.map(timed_query, queries))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds for _, seconds in results)
+    failures = sum(1 for status, _ in results if status >= 400)
+    print(f"{len(results)} queries from {args.clients} clients in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f} queries/s, {failures} failed)")
+    for fraction in [0.5, 0.95, 0.99]:
+        print(f"  p{int(fraction * 100)} latency: "
+              f"{percentile(latencies, fraction) * 1000:.1f} ms")
+
+    with urlopen(f"http://127.0.0.1:{args.port}/stats") as response:
+        print(f"Server counters: {json.load(response)}")
+
+
+if __name__ == "__main__":
+    main()
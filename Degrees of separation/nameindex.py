@@ -0,0 +1,189 @@
+import bisect
+import heapq
+from array import array
+
+# Positions counted per fuzzy search, rarest trigrams first, so that the
+# time taken does not grow with the number of names, and how many of
+# the positions counted most (as a multiple of those returned) are then
+# ranked by their exact counts. NumPy affords more of both in less time.
+MAX_SCANNED = 4000
+SHORTLIST = 2
+MAX_SCANNED_NUMPY = 12000
+SHORTLIST_NUMPY = 20
+
+# Names added after the index was built, kept apart until there are this many
+MAX_RECENT = 1024
+
+
+class NameIndex():
+
+    def __init__(self, names):
+        """
+        Index of lowercase names for prefix and fuzzy lookups.
+            - `keys`: the list of names, in the order they were indexed
+            - `sorted_keys`: the names in sorted order, searched with bisect
+            - `recent`: sorted names added since `sorted_keys` was last
+              merged, so that adding a name does not shift the whole list
+            - `trigrams`: maps each trigram of a padded name to an
+              array of the positions in `keys` of names containing it
+        """
+        self.keys = sorted(names)
+        self.sorted_keys = list(self.keys)
+        self.recent = []
+        self.trigrams = dict()
+        for position, name in enumerate(self.keys):
+            self._index(name, position)
+
+    def _index(self, name, position):
+        """
+        Adds `position` to the postings of every trigram of `name`.
+        """
+        for trigram in set(trigrams(name)):
+            posting = self.trigrams.get(trigram)
+            if posting is None:
+                posting = self.trigrams[trigram] = array("i")
+            posting.append(position)
+
+    def add(self, name):
+        """
+        Adds a new lowercase `name` to the index.
+        """
+        if self.contains(name):
+            return
+        bisect.insort(self.recent, name)
+        self.keys.append(name)
+        self._index(name, len(self.keys) - 1)
+
+        # Sorting two sorted runs merges them in linear time
+        if len(self.recent) >= MAX_RECENT:
+            self.sorted_keys.extend(self.recent)
+            self.sorted_keys.sort()
+            self.recent = []
+
+    def contains(self, name):
+        """
+        Returns True if the lowercase `name` is in the index.
+        """
+        for keys in (self.sorted_keys, self.recent):
+            position = bisect.bisect_left(keys, name)
+            if position < len(keys) and keys[position] == name:
+                return True
+        return False
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in sorted order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        for keys in (self.sorted_keys, self.recent):
+            start = bisect.bisect_left(keys, prefix)
+            for name in keys[start:start + limit]:
+                if not name.startswith(prefix):
+                    break
+                matches.append(name)
+        return sorted(matches)[:limit]
+
+    def fuzzy(self, query, limit=10, cutoff=0.5):
+        """
+        Returns up to `limit` (name, score) pairs for the names most
+        similar to `query`, best first. Candidates are the names sharing
+        the most trigrams with the query (see `most_shared`); they are
+        scored by trigram overlap (the Dice coefficient, between 0 and
+        1), dropping those scoring below `cutoff`.
+        """
+        query = query.lower()
+        query_trigrams = set(trigrams(query))
+        postings = sorted(
+            (self.trigrams[trigram] for trigram in query_trigrams
+             if trigram in self.trigrams),
+            key=len
+        )
+        if not postings:
+            return []
+
+        scored = []
+        for position in most_shared(postings, limit * 2):
+            name = self.keys[position]
+            name_trigrams = set(trigrams(name))
+            score = (2 * len(query_trigrams & name_trigrams)
+                     / (len(query_trigrams) + len(name_trigrams)))
+            if score >= cutoff:
+                scored.append((name, score))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:limit]
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` ranked (name, score) candidates for `query`:
+        an exact match first (score 1), then names starting with the
+        query, then fuzzy matches.
+        """
+        query = query.lower()
+        results = dict()
+        if self.contains(query):
+            results[query] = 1.0
+        for name in self.prefix(query, limit):
+            results.setdefault(name, len(query) / len(name))
+        if len(results) < limit:
+            for name, score in self.fuzzy(query, limit):
+                results.setdefault(name, score)
+        ranked = sorted(results.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked[:limit]
+
+
+def most_shared(postings, count):
+    """
+    Returns (up to) `count` positions found in the most of `postings`
+    (sorted arrays of positions, shortest first).
+
+    Positions are counted over the shortest postings that fit the
+    scanning budget (at least one). The few times `count` positions
+    counted most are then looked up in the other postings by binary
+    search, so that they are ranked by their exact counts.
+    """
+    try:
+        import numpy as np
+        budget, shortlist = MAX_SCANNED_NUMPY, count * SHORTLIST_NUMPY
+    except ImportError:
+        np = None
+        budget, shortlist = MAX_SCANNED, count * SHORTLIST
+    scanned = 1
+    total = len(postings[0])
+    while scanned < len(postings) and total + len(postings[scanned]) <= budget:
+        total += len(postings[scanned])
+        scanned += 1
+
+    if np is None:
+        shared = dict()
+        for posting in postings[:scanned]:
+            for position in posting:
+                shared[position] = shared.get(position, 0) + 1
+        candidates = heapq.nlargest(shortlist, shared, key=shared.get)
+        for posting in postings[scanned:]:
+            for position in candidates:
+                i = bisect.bisect_left(posting, position)
+                if i < len(posting) and posting[i] == position:
+                    shared[position] += 1
+        return heapq.nlargest(count, candidates, key=shared.get)
+
+    arrays = [np.frombuffer(posting, dtype=np.intc) for posting in postings]
+    positions, shared = np.unique(np.concatenate(arrays[:scanned]), return_counts=True)
+    if len(positions) > shortlist:
+        best = np.argpartition(-shared, shortlist)[:shortlist]
+        positions, shared = positions[best], shared[best]
+    for posting in arrays[scanned:]:
+        found = np.minimum(np.searchsorted(posting, positions), len(posting) - 1)
+        shared += posting[found] == positions
+    if len(positions) > count:
+        positions = positions[np.argpartition(-shared, count)[:count]]
+    return positions.tolist()
+
+
+def trigrams(name):
+    """
+    Returns the list of trigrams of `name`, padded with spaces so that
+    the start and end of the name form trigrams of their own.
+    """
+    padded = f"  {name} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
@@ -0,0 +1,182 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+class Counters():
+
+    def __init__(self):
+        """
+        Thread-safe request counters for the server.
+        """
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0
+
+    def record(self, seconds, error=False):
+        """
+        Records one answered request that took `seconds`.
+        """
+        with self.lock:
+            self.requests += 1
+            self.seconds += seconds
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        """
+        Returns the current counters, mean latency and throughput.
+        """
+        with self.lock:
+            uptime = time.time() - self.started
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "uptime": uptime,
+                "mean_latency": self.seconds / self.requests if self.requests else None,
+                "throughput": self.requests / uptime if uptime else None
+            }
+
+
+def resolve(field, value):
+    """
+    Returns a (person_id, status, response) triple for a query field,
+    which may be an IMDB person id or a name. If the field cannot be
+    resolved, person_id is None and `response` describes why, listing
+    the candidates when the name is ambiguous.
+    """
+    if value in degrees.people:
+        return value, None, None
+    candidates = degrees.candidates_for_name(value)
+    if len(candidates) == 0:
+        return None, 404, {
+            "error": "not found",
+            "field": field,
+            "name": value,
+            "suggestions": degrees.suggest_names(value)
+        }
+    elif len(candidates) > 1:
+        return None, 300, {
+            "error": "ambiguous",
+            "field": field,
+            "name": value,
+            "candidates": candidates
+        }
+    else:
+        return candidates[0]["id"], None, None
+
+
+def answer(query):
+    """
+    Answers a parsed `/path` query string and returns (status, response).
+    """
+    source = query.get("source", [None])[0]
+    target = query.get("target", [None])[0]
+    if source is None or target is None:
+        return 400, {"error": "source and target are required"}
+    bidirectional = query.get("bidirectional", ["0"])[0] not in ("0", "false", "")
+
+    source_id, status, response = resolve("source", source)
+    if source_id is None:
+        return status, response
+    target_id, status, response = resolve("target", target)
+    if target_id is None:
+        return status, response
+
+    path = degrees.shortest_path(source_id, target_id, bidirectional=bidirectional)
+    return 200, {
+        "source": source_id,
+        "source_name": degrees.people[source_id]["name"],
+        "target": target_id,
+        "target_name": degrees.people[target_id]["name"],
+        "degrees": None if path is None else len(path),
+        "path": None if path is None else [
+            {
+                "movie_id": movie_id,
+                "title": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"]
+            }
+            for movie_id, person_id in path
+        ]
+    }
+
+
+class Server(ThreadingHTTPServer):
+
+    # Allow bursts of concurrent clients to queue instead of being refused
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    counters = Counters()
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path == "/path":
+            status, response = answer(parse_qs(url.query))
+            self.counters.record(time.perf_counter() - start, error=status >= 400)
+        elif url.path == "/stats":
+            status, response = 200, self.counters.snapshot()
+        else:
+            status, response = 404, {"error": "unknown endpoint"}
+        self.send_json(status, response)
+
+    def send_json(self, status, response):
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees-of-separation queries over HTTP on localhost."
+    )
+    parser.add_argument("directory", nargs="?", default="databases")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--compact", action="store_true",
+                        help="store the cast graph as integer CSR arrays")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load from (or create) a memory-mapped snapshot")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="index names to suggest matches for unknown names")
+    parser.add_argument("--costar-cache", type=int, metavar="SIZE",
+                        help="cache the co-stars of the SIZE people with the "
+                             "most co-stars")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    info = degrees.load_data(args.directory, compact=args.compact, snapshot=args.snapshot,
+                             index_names=args.fuzzy)
+    print(f"Data loaded from {info['source']} in {info['seconds']:.2f}s.")
+    if args.costar_cache:
+        degrees.enable_costar_cache(args.costar_cache)
+
+    server = Server(("127.0.0.1", args.port), Handler)
+    print(f"Serving on http://127.0.0.1:{args.port}/path?source=...&target=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from compact import CompactGraph
+
+MAGIC = b"DEGSNAP3"
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file for a data `directory`.
+    """
+    return os.path.join(directory, FILENAME)
+
+
+def source_stats(directory):
+    """
+    Returns a dictionary mapping each source CSV file name
+    to its [mtime_ns, size], used to detect stale snapshots.
+    """
+    stats = dict()
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        stats[filename] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def write_snapshot(directory, graph, people, movies, info):
+    """
+    Writes `graph` and the name/birth and title/year records of
+    `people` and `movies` to the snapshot file of `directory`, along
+    with the `info` dictionary returned by the CSV load.
+
+    Layout: MAGIC, header length (8 bytes), UTF-8 JSON header, then the
+    raw int32 CSR arrays (each aligned to 8 bytes) in `ARRAYS` order.
+    """
+    header = {
+        "sources": source_stats(directory),
+        "byteorder": sys.byteorder,
+        "info": info,
+        "person_ids": graph.person_ids,
+        "person_names": [people[i]["name"] for i in graph.person_ids],
+        "person_births": [people[i]["birth"] for i in graph.person_ids],
+        "movie_ids": graph.movie_ids,
+        "movie_titles": [movies[i]["title"] for i in graph.movie_ids],
+        "movie_years": [movies[i]["year"] for i in graph.movie_ids],
+        "lengths": [len(getattr(graph, name)) for name in ARRAYS]
+    }
+    header = json.dumps(header, separators=(",", ":")).encode()
+
+    # Write to a temporary file first so a crash never leaves a torn snapshot
+    path = snapshot_path(directory)
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name in ARRAYS:
+            f.write(b"\0" * (-f.tell() % 8))
+            f.write(memoryview(getattr(graph, name)).cast("B"))
+    os.replace(path + ".tmp", path)
+
+
+def read_snapshot(directory, filters):
+    """
+    Memory-maps the snapshot file of `directory`.
+
+    Returns a (graph, people, movies, info) tuple whose graph arrays
+    are views into the mapped file, or None if there is no readable
+    snapshot or it no longer matches the source CSV files or the load
+    `filters`.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if data[:len(MAGIC)] != MAGIC:
+        return None
+
+    # A truncated or malformed header makes the snapshot stale, not fatal
+    try:
+        offset = len(MAGIC)
+        (header_length,) = struct.unpack_from("<Q", data, offset)
+        offset += 8
+        header = json.loads(data[offset:offset + header_length])
+        offset += header_length
+
+        # Check that the snapshot is still valid for this machine and these files
+        if header["sources"] != source_stats(directory):
+            return None
+        if header["byteorder"] != sys.byteorder:
+            return None
+        if header["info"]["filters"] != filters:
+            return None
+
+        arrays = []
+        view = memoryview(data)
+        for length in header["lengths"]:
+            offset += -offset % 8
+            if offset + 4 * length > len(data):
+                return None
+            arrays.append(view[offset:offset + 4 * length].cast("i"))
+            offset += 4 * length
+
+        graph = CompactGraph(header["person_ids"], header["movie_ids"], *arrays)
+        people = {
+            person_id: {"name": name, "birth": birth}
+            for person_id, name, birth in zip(
+                header["person_ids"], header["person_names"], header["person_births"]
+            )
+        }
+        movies = {
+            movie_id: {"title": title, "year": year}
+            for movie_id, title, year in zip(
+                header["movie_ids"], header["movie_titles"], header["movie_years"]
+            )
+        }
+        return graph, people, movies, header["info"]
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
@@ -0,0 +1,186 @@
+import heapq
+import random
+
+import pytest
+
+import degrees
+from generate import generate
+
+# Size of the generated database; casting favours a few hub actors, so
+# many people are never cast and disconnected pairs are common
+PEOPLE = 600
+MOVIES = 800
+PAIRS = 200
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("database")
+    generate(directory, PEOPLE, MOVIES, seed=1)
+    return str(directory)
+
+
+def sample_pairs(seed=0):
+    """
+    Returns `PAIRS` random (source, target) pairs of loaded people,
+    including some pairs of a person with themselves.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(PAIRS)]
+    return pairs + [(person_id, person_id) for person_id in person_ids[:10]]
+
+
+def assert_valid_path(source, target, path):
+    """
+    Checks that each step of `path` is a movie both people starred in.
+    """
+    person_id = source
+    for movie_id, next_id in path:
+        assert (movie_id, next_id) in degrees.neighbors_for_person(person_id)
+        person_id = next_id
+    assert person_id == target
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_bidirectional_matches_breadth_first(directory, compact):
+    degrees.load_data(directory, compact=compact)
+    disconnected = 0
+    for source, target in sample_pairs():
+        expected = degrees.shortest_path(source, target)
+        path = degrees.shortest_path(source, target, bidirectional=True)
+        if expected is None:
+            assert path is None
+            disconnected += 1
+            continue
+        assert len(path) == len(expected)
+        assert_valid_path(source, target, path)
+        if source == target:
+            assert path == []
+    assert disconnected > 0
+
+
+def test_k_shortest_paths_match_ranking_all_paths(directory):
+    degrees.load_data(directory)
+    for movie_id in list(degrees.movies)[::10]:
+        degrees.movies[movie_id]["year"] = "\\N"
+    for source, target in sample_pairs()[:80]:
+        paths = list(degrees.all_shortest_paths(source, target))
+        for k in [1, 5]:
+            expected = heapq.nsmallest(k, paths, key=degrees.path_recency)
+            found = degrees.k_shortest_paths(source, target, k)
+            assert list(map(degrees.path_recency, found)) == list(map(degrees.path_recency, expected))
+            assert all(path in paths for path in found)
+            assert len(set(map(tuple, found))) == len(found)
+
+
+def write_database(directory, stars):
+    """
+    Writes a small database of people "1" to "4" and movies "10" and
+    "11" starring the (person_id, movie_id) pairs in `stars`.
+    """
+    (directory / "people.csv").write_text(
+        "id,name,birth\n1,Ann,1970\n2,Bob,1971\n3,Cy,1972\n4,Di,1973\n"
+    )
+    (directory / "movies.csv").write_text("id,title,year\n10,First,2000\n11,Second,2001\n")
+    (directory / "stars.csv").write_text(
+        "person_id,movie_id\n" + "".join(f"{person},{movie}\n" for person, movie in stars)
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_duplicate_stars_are_skipped(tmp_path, compact):
+    write_database(tmp_path, [("1", "10"), ("1", "10"), ("2", "11"), ("3", "11"), ("2", "11")])
+    info = degrees.load_data(str(tmp_path), compact=compact, min_cast=2)
+    assert info["skipped"]["stars_duplicate"] == 2
+    assert info["skipped"]["movies_by_cast"] == 1
+    assert set(degrees.movies) == {"11"}
+    assert degrees.neighbors_for_person("2") == {("11", "2"), ("11", "3")}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_added_person_with_costar_index(tmp_path, compact):
+    write_database(tmp_path, [("1", "10"), ("2", "10"), ("2", "11"), ("3", "11")])
+    degrees.load_data(str(tmp_path), compact=compact)
+    degrees.build_costar_index()
+    degrees.add_person("5", "Ed")
+    assert degrees.shortest_path("5", "1") is None
+    assert degrees.shortest_path("1", "5", bidirectional=True) is None
+    degrees.add_star("5", "11")
+    assert degrees.shortest_path("5", "1") == [("11", "2"), ("10", "1")]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_added_person_drops_landmarks(tmp_path, compact):
+    write_database(tmp_path, [("1", "10"), ("2", "10"), ("2", "11"), ("3", "11")])
+    degrees.load_data(str(tmp_path), compact=compact)
+    degrees.build_landmarks(2)
+    degrees.add_person("5", "Ed")
+    assert degrees.oracle is None
+    with pytest.raises(Exception, match="build_landmarks"):
+        degrees.separation_bounds("5", "1")
+    degrees.build_landmarks(2)
+    assert degrees.separation_bounds("5", "1")[0] is None
+    assert degrees.separation_bounds("3", "1") == (2, 2)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_remove_movie(tmp_path, compact):
+    write_database(tmp_path, [("1", "10"), ("2", "10"), ("2", "11"), ("3", "11")])
+    degrees.load_data(str(tmp_path), compact=compact)
+    with pytest.raises(Exception):
+        degrees.remove_movie("12")
+    degrees.remove_movie("10")
+    assert set(degrees.movies) == {"11"}
+    assert degrees.shortest_path("1", "3") is None
+    assert degrees.neighbors_for_person("2") == {("11", "2"), ("11", "3")}
+    if compact:
+        assert degrees.graph.rebuilt().movie_ids == ["11"]
+        degrees.add_movie("10", "First", "2000", stars=["1", "3"])
+        assert degrees.shortest_path("1", "2") == [("10", "3"), ("11", "2")]
+
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_remove_star(tmp_path, compact):
+    write_database(tmp_path, [("1", "10"), ("2", "10"), ("2", "11"), ("3", "11")])
+    degrees.load_data(str(tmp_path), compact=compact)
+    with pytest.raises(Exception, match="Unknown person"):
+        degrees.remove_star("1", "12")
+    with pytest.raises(Exception, match="Unknown person"):
+        degrees.remove_star("5", "10")
+    degrees.remove_star("4", "10")
+    degrees.remove_star("2", "11")
+    assert degrees.stars_for_movie("11") == {"3"}
+    assert degrees.shortest_path("1", "3") is None
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_hub_cache(directory, compact):
+    degrees.load_data(directory, compact=compact)
+    pairs = sample_pairs()[:50]
+    expected = [degrees.shortest_path(source, target) for source, target in pairs]
+    degrees.enable_costar_cache(PEOPLE // 100)
+    for _ in range(2):
+        paths = [
+            degrees.shortest_path(source, target, bidirectional=True) for source, target in pairs
+        ]
+        assert [path and len(path) for path in paths] == [path and len(path) for path in expected]
+    cache = degrees.costar_cache
+    assert cache.hit_pairs > cache.miss_pairs / 10
+
+    # Updating a hub's credits replaces its cached co-stars
+    hub = max(cache.cache, key=degrees.costar_pair_count)
+    degrees.add_movie("new", "New", "2024", stars=[hub, "1"])
+    assert ("new", "1") in degrees.neighbors_for_person(hub)
+
+
+@pytest.mark.parametrize("size", [12, 40, 200])
+def test_truncated_snapshot_is_rebuilt(tmp_path, size):
+    write_database(tmp_path, [("1", "10"), ("2", "10"), ("2", "11"), ("3", "11")])
+    assert degrees.load_data(str(tmp_path), snapshot=True)["source"] == "csv"
+    assert degrees.load_data(str(tmp_path), snapshot=True)["source"] == "snapshot"
+    path = tmp_path / "degrees.snapshot"
+    path.write_bytes(path.read_bytes()[:size])
+    assert degrees.load_data(str(tmp_path), snapshot=True)["source"] == "csv"
+    assert degrees.shortest_path("1", "3") == [("10", "2"), ("11", "3")]
+    assert degrees.load_data(str(tmp_path), snapshot=True)["source"] == "snapshot"
@@ -0,0 +1,54 @@
+import random
+import sys
+
+import pytest
+
+import nameindex
+from nameindex import NameIndex
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def random_names(count, seed=0):
+    """
+    Returns `count` distinct random lowercase "first last" names.
+    """
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        first = "".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 8)))
+        last = "".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 10)))
+        names.add(f"{first} {last}")
+    return sorted(names)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def counting(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    return request.param
+
+
+def test_fuzzy_finds_mistyped_names(counting):
+    names = random_names(20000)
+    index = NameIndex(names)
+    rng = random.Random(1)
+    for name in rng.sample(names, 50):
+        i = rng.randrange(1, len(name) - 1)
+        query = name[:i] + name[i + 1:]
+        assert index.search(query, 5)[0][0] == name
+
+
+def test_added_names(monkeypatch):
+    monkeypatch.setattr(nameindex, "MAX_RECENT", 8)
+    index = NameIndex(random_names(1000))
+    added = random_names(20, seed=2)
+    for name in added:
+        index.add(name)
+        index.add(name)
+    assert len(index.keys) == len(set(index.keys))
+    assert index.sorted_keys == sorted(index.sorted_keys)
+    for name in added:
+        assert index.contains(name)
+        assert index.prefix(name[:-1], 1000).count(name) == 1
+        assert index.search(name[:-1] + "q", 5)[0][0] == name
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, person, connection, movie):
         self.person = person
@@ -36,3 +39,85 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class HashedStackFrontier():
+    """
+    Stack frontier backed by a deque, with a set of the person ids
+    currently in the frontier so that `contains_person` is O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.people = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.people.add(node.person)
+
+    def contains_person(self, person):
+        return person in self.people
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.people.discard(node.person)
+            return node
+
+
+class HashedQueueFrontier(HashedStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.people.discard(node.person)
+            return node
+
+
+class HubCache():
+    """
+    Cache of the co-star pairs of the people in `hubs` only: a hub's
+    pairs are kept (as a frozenset) the first time they are computed,
+    while anyone else's are computed on every call. A breadth-first
+    search expands each person once, so a recency-based cache never
+    sees a repeat within a search; hubs are expanded by almost every
+    search and account for most of the pairs.
+        - `hits` / `misses`: calls answered from / not from the cache
+        - `hit_pairs` / `miss_pairs`: co-star pairs those calls returned
+    """
+
+    def __init__(self, function, hubs):
+        self.function = function
+        self.hubs = hubs
+        self.cache = dict()
+        self.hits = 0
+        self.misses = 0
+        self.hit_pairs = 0
+        self.miss_pairs = 0
+
+    def __call__(self, person_id):
+        neighbors = self.cache.get(person_id)
+        if neighbors is not None:
+            self.hits += 1
+            self.hit_pairs += len(neighbors)
+            return neighbors
+        neighbors = self.function(person_id)
+        self.misses += 1
+        self.miss_pairs += len(neighbors)
+        if person_id in self.hubs:
+            neighbors = frozenset(neighbors)
+            self.cache[person_id] = neighbors
+        return neighbors
+
+    def discard(self, person_id):
+        self.cache.pop(person_id, None)
+
+    def cache_clear(self):
+        self.cache.clear()
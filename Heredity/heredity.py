@@ -1,6 +1,6 @@
+import argparse
 import csv
 import itertools
-import sys
 
 PROBS = {
 
@@ -40,10 +40,28 @@ PROBS = {
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
-    people = load_data(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Infer gene and trait probabilities.")
+    parser.add_argument("data", help="CSV file of name, mother, father, trait")
+    parser.add_argument("--engine", choices=["enumeration", "elimination"],
+                        default="enumeration",
+                        help="enumerate every assignment, or run variable elimination "
+                             "(exact and fast for large families)")
+    args = parser.parse_args()
+    people = load_data(args.data)
 
+    if args.engine == "elimination":
+        from inference import probabilities
+        print_probabilities(people, probabilities(people))
+        return
+
+    print_probabilities(people, enumerate_probabilities(people))
+
+
+def enumerate_probabilities(people):
+    """
+    Returns the gene and trait distribution of each person given the
+    known traits, by enumerating every assignment of genes and traits.
+    """
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -83,8 +101,13 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
+
 
-    # Print results
+def print_probabilities(people, probabilities):
+    """
+    Prints the gene and trait distribution of each person.
+    """
     for person in people:
         print(f"{person}:")
         for field in probabilities[person]:
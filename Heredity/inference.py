@@ -0,0 +1,251 @@
+import heapq
+import itertools
+
+from heredity import PROBS
+
+# Possible numbers of copies of the gene
+GENES = (0, 1, 2)
+
+
+class Factor():
+
+    def __init__(self, variables, table):
+        """
+        Table of non-negative values over the gene counts of some people.
+            - `variables`: tuple of the names of the people
+            - `table`: maps each tuple of gene counts (one per variable,
+              in the same order) to a value
+        """
+        self.variables = tuple(variables)
+        self.table = table
+
+    def multiply(self, other):
+        """
+        Returns the product of this factor and `other`, over the union
+        of their variables.
+        """
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        mine = [variables.index(v) for v in self.variables]
+        theirs = [variables.index(v) for v in other.variables]
+        table = dict()
+        for genes in itertools.product(GENES, repeat=len(variables)):
+            table[genes] = (self.table[tuple(genes[i] for i in mine)]
+                            * other.table[tuple(genes[i] for i in theirs)])
+        return Factor(variables, table)
+
+    def sum_out(self, variables):
+        """
+        Returns the factor over the remaining variables obtained by summing
+        over every gene count of `variables`.
+        """
+        keep = [i for i, v in enumerate(self.variables) if v not in variables]
+        table = dict()
+        for genes, value in self.table.items():
+            key = tuple(genes[i] for i in keep)
+            table[key] = table.get(key, 0) + value
+        return Factor([self.variables[i] for i in keep], table)
+
+    def normalised(self):
+        """
+        Returns this factor scaled to sum to 1, so that long chains of
+        products of probabilities do not underflow.
+        """
+        total = sum(self.table.values())
+        return Factor(self.variables, {
+            genes: value / total for genes, value in self.table.items()
+        })
+
+
+def multiply(factors, variables=()):
+    """
+    Returns the product of `factors`, starting from a factor of ones
+    over `variables`.
+    """
+    product = Factor(variables, {
+        genes: 1 for genes in itertools.product(GENES, repeat=len(variables))
+    })
+    for factor in factors:
+        product = product.multiply(factor)
+    return product
+
+
+def inheritance(genes):
+    """
+    Returns the probability that a parent with `genes` copies of the
+    gene passes one copy on to a child.
+    """
+    return {
+        0: PROBS["mutation"],
+        1: 0.5,
+        2: 1 - PROBS["mutation"]
+    }[genes]
+
+
+def person_factor(people, person):
+    """
+    Returns the factor of `person` in the family network: the
+    probability of their gene count (given their parents' gene counts,
+    if both parents are known) times the probability of their trait if
+    it is known.
+    """
+    trait = people[person]["trait"]
+
+    def evidence(genes):
+        return 1 if trait is None else PROBS["trait"][genes][trait]
+
+    mother = people[person]["mother"]
+    father = people[person]["father"]
+    if mother is None or father is None:
+        return Factor([person], {
+            (genes,): PROBS["gene"][genes] * evidence(genes) for genes in GENES
+        })
+
+    table = dict()
+    for genes, mother_genes, father_genes in itertools.product(GENES, repeat=3):
+        from_mother = inheritance(mother_genes)
+        from_father = inheritance(father_genes)
+        p = {
+            0: (1 - from_mother) * (1 - from_father),
+            1: from_mother * (1 - from_father) + (1 - from_mother) * from_father,
+            2: from_mother * from_father
+        }[genes]
+        table[(genes, mother_genes, father_genes)] = p * evidence(genes)
+    return Factor([person, mother, father], table)
+
+
+def elimination_order(factors):
+    """
+    Returns an order in which to eliminate the variables of `factors`,
+    chosen greedily to add the fewest edges between the variables left
+    (min-fill), breaking ties by fewest neighbours (min-degree). On the
+    moral graph of a tree-like family this keeps every intermediate
+    factor small.
+    """
+    neighbours = dict()
+    for factor in factors:
+        for v in factor.variables:
+            neighbours.setdefault(v, set()).update(u for u in factor.variables if u != v)
+
+    def score(v):
+        others = list(neighbours[v])
+        fill = sum(
+            1 for i, u in enumerate(others) for w in others[i + 1:]
+            if w not in neighbours[u]
+        )
+        return fill, len(others)
+
+    # Heap entries go stale as the graph changes; only current scores count
+    scores = {v: score(v) for v in neighbours}
+    heap = [(scores[v], v) for v in neighbours]
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        entry, v = heapq.heappop(heap)
+        if v not in scores or scores[v] != entry:
+            continue
+        order.append(v)
+        del scores[v]
+
+        # Connect the neighbours of v to each other and remove v
+        others = neighbours.pop(v)
+        for u in others:
+            neighbours[u].discard(v)
+            neighbours[u].update(w for w in others if w != u)
+
+        # Eliminating v only changes the scores of nearby variables
+        for u in set(others).union(*(neighbours[u] for u in others)):
+            new_score = score(u)
+            if new_score != scores[u]:
+                scores[u] = new_score
+                heapq.heappush(heap, (new_score, u))
+    return order
+
+
+def gene_marginals(people):
+    """
+    Returns a dictionary mapping each person to their distribution over
+    gene counts given the known traits, computed exactly in one upward
+    and one downward pass over the cluster tree formed by variable
+    elimination.
+    """
+    factors = [person_factor(people, person) for person in people]
+    order = elimination_order(factors)
+
+    # Variable elimination: cluster i is formed when order[i] is eliminated
+    # and sends its message to the cluster that later consumes it. The
+    # factors not yet consumed are (factor, source cluster) pairs, found
+    # through the keys of the factors holding each variable.
+    pool = {key: (factor, None) for key, factor in enumerate(factors)}
+    holding = dict()
+    for key, factor in enumerate(factors):
+        for u in factor.variables:
+            holding.setdefault(u, set()).add(key)
+
+    scopes = []
+    potentials = []
+    up = []
+    children = []
+    for i, v in enumerate(order):
+        involved = []
+        for key in sorted(holding.pop(v)):
+            factor, source = pool.pop(key)
+            involved.append((factor, source))
+            for u in factor.variables:
+                if u != v:
+                    holding[u].discard(key)
+        scope = tuple(dict.fromkeys(u for factor, _ in involved for u in factor.variables))
+        scopes.append(scope)
+        potentials.append(multiply(
+            [factor for factor, source in involved if source is None], scope
+        ))
+        children.append([source for _, source in involved if source is not None])
+        message = multiply([potentials[i]] + [up[c] for c in children[i]]).sum_out([v])
+        up.append(message.normalised())
+        if message.variables:
+            key = len(factors) + i
+            pool[key] = (up[i], i)
+            for u in message.variables:
+                holding[u].add(key)
+
+    # Downward pass, from the roots of the cluster tree to the leaves
+    down = [None] * len(order)
+    marginals = dict()
+    for i in reversed(range(len(order))):
+        incoming = [up[c] for c in children[i]]
+        if down[i] is not None:
+            incoming.append(down[i])
+        for c in children[i]:
+            others = [message for message in incoming if message is not up[c]]
+            belief = multiply([potentials[i]] + others)
+            down[c] = belief.sum_out(
+                [u for u in scopes[i] if u not in up[c].variables]
+            ).normalised()
+
+        belief = multiply([potentials[i]] + incoming).sum_out(
+            [u for u in scopes[i] if u != order[i]]
+        )
+        total = sum(belief.table.values())
+        marginals[order[i]] = {genes: belief.table[(genes,)] / total for genes in GENES}
+    return marginals
+
+
+def probabilities(people):
+    """
+    Returns the gene and trait distribution of each person given the
+    known traits, in the format computed by `heredity.main`.
+    """
+    genes = gene_marginals(people)
+    result = dict()
+    for person in people:
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(genes[person][g] * PROBS["trait"][g][True] for g in GENES)
+        else:
+            has_trait = 1 if trait else 0
+        result[person] = {
+            "gene": {g: genes[person][g] for g in reversed(GENES)},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return result
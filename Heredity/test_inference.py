@@ -0,0 +1,60 @@
+import glob
+import os
+
+import pytest
+
+import heredity
+import inference
+
+# Largest difference allowed between elimination and enumeration
+TOLERANCE = 1e-12
+
+
+def family(rows):
+    """
+    Returns a family in the format of `heredity.load_data` from
+    (name, mother, father, trait) rows.
+    """
+    return {
+        name: {"name": name, "mother": mother, "father": father, "trait": trait}
+        for name, mother, father, trait in rows
+    }
+
+
+def assert_matches_enumeration(people):
+    expected = heredity.enumerate_probabilities(people)
+    found = inference.probabilities(people)
+    for person in people:
+        for field in expected[person]:
+            for value in expected[person][field]:
+                assert found[person][field][value] == pytest.approx(
+                    expected[person][field][value], abs=TOLERANCE
+                )
+
+
+@pytest.mark.parametrize(
+    "filename", sorted(glob.glob(os.path.join(os.path.dirname(__file__), "data", "family*.csv")))
+)
+def test_example_families(filename):
+    assert_matches_enumeration(heredity.load_data(filename))
+
+
+def test_child_of_siblings():
+    assert_matches_enumeration(family([
+        ("Ann", None, None, None),
+        ("Bob", None, None, False),
+        ("Cat", "Ann", "Bob", None),
+        ("Dan", "Ann", "Bob", True),
+        ("Eve", "Cat", "Dan", True)
+    ]))
+
+
+def test_child_of_half_siblings():
+    assert_matches_enumeration(family([
+        ("Ann", None, None, None),
+        ("Bob", None, None, True),
+        ("Cy", None, None, None),
+        ("Dot", "Ann", "Bob", False),
+        ("Ed", "Ann", "Cy", None),
+        ("Fay", "Dot", "Ed", True)
+    ]))
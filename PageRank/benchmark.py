@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+
+import crawler
+import pagerank
+from engine import LinkGraph, power_iteration, sample_ranks, solve
+from generate import generate_graph, write_corpus
+from outofcore import EdgeList, stream_power_iteration, write_edges
+
+# The dictionary-based sample_pagerank and iterate_pagerank are quadratic
+# in the number of pages, so only time them on small corpora
+MAX_PAGES_FOR_DICT_ENGINES = 1000
+
+# Writing and crawling a file per page is slow, so larger graphs skip it
+MAX_PAGES_FOR_HTML = 100000
+
+# Timings recorded for each scale, in the order they are reported
+TIMINGS = [
+    "generate", "write_html", "crawl", "crawl_cold", "crawl_warm",
+    "sample", "sample_vectorised", "iterate", "iterate_sparse",
+    "iterate_quadratic", "stream"
+]
+
+
+def timed(function, *args, **kwargs):
+    """
+    Returns the time in seconds taken by `function(*args, **kwargs)`
+    and its result.
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_scale(num_pages, samples, seed=0):
+    """
+    Generates a synthetic web graph of `num_pages` pages and returns a
+    dictionary of timings (in seconds) for crawling it as HTML, sampling
+    `samples` pages and iterating PageRank with each engine.
+    """
+    result = {"pages": num_pages, "samples": samples}
+    result["generate"], (sources, targets) = timed(generate_graph, num_pages, seed=seed)
+    result["links"] = len(sources)
+    pages = [f"{page}.html" for page in range(num_pages)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        if num_pages <= MAX_PAGES_FOR_HTML:
+            corpus_directory = os.path.join(directory, "corpus")
+            result["write_html"], _ = timed(write_corpus, corpus_directory, num_pages,
+                                            sources, targets)
+            result["crawl"], corpus = timed(pagerank.crawl, corpus_directory)
+            result["crawl_cold"], _ = timed(crawler.crawl, corpus_directory, use_cache=False)
+            result["crawl_warm"], _ = timed(crawler.crawl, corpus_directory)
+
+            if num_pages <= MAX_PAGES_FOR_DICT_ENGINES:
+                result["sample"], _ = timed(pagerank.sample_pagerank, corpus,
+                                            pagerank.DAMPING, samples)
+                result["iterate"], _ = timed(pagerank.iterate_pagerank, corpus,
+                                             pagerank.DAMPING)
+
+        # Faster engines work on the link graph directly
+        graph = LinkGraph(pages, sources, targets)
+        result["sample_vectorised"], _ = timed(sample_ranks, graph, pagerank.DAMPING,
+                                               samples, seed)
+        result["iterate_sparse"], (_, result["iterations"]) = timed(
+            power_iteration, graph, pagerank.DAMPING, pagerank.TOLERANCE
+        )
+        result["iterate_quadratic"], _ = timed(solve, graph, pagerank.DAMPING, "quadratic",
+                                               pagerank.TOLERANCE)
+        del graph
+
+        path = os.path.join(directory, "graph.edges")
+        write_edges(path, pages, sources, targets)
+        edge_list = EdgeList(path)
+        result["stream"], _ = timed(stream_power_iteration, edge_list, pagerank.DAMPING,
+                                    pagerank.TOLERANCE)
+        edge_list.close()
+
+    return result
+
+
+def compare(results, baseline):
+    """
+    Prints the ratio of each timing in `results` to the same timing
+    in `baseline` (both in the JSON format written by `main`).
+    """
+    previous = {entry["pages"]: entry for entry in baseline["results"]}
+    for entry in results["results"]:
+        old = previous.get(entry["pages"])
+        if old is None:
+            continue
+        print(f"{entry['pages']} pages (new / baseline):")
+        for key in TIMINGS:
+            if key in entry and key in old and old[key]:
+                print(f"  {key}: {entry[key] / old[key]:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark crawling, sampling and iterating PageRank on synthetic web graphs."
+    )
+    parser.add_argument("--scales", default="100,1000,10000,100000,1000000",
+                        help="comma-separated numbers of pages to test")
+    parser.add_argument("--samples", type=int, default=pagerank.SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json",
+                        help="file to write the JSON results to")
+    parser.add_argument("--compare", metavar="JSON",
+                        help="earlier results to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": []
+    }
+    for scale in [int(scale) for scale in args.scales.split(",")]:
+        result = bench_scale(scale, args.samples, args.seed)
+        results["results"].append(result)
+        print(f"{scale} pages ({result['links']} links): " + ", ".join(
+            f"{key} {result[key]:.4g}s" for key in TIMINGS if key in result
+        ))
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {os.path.abspath(args.output)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
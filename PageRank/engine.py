@@ -0,0 +1,551 @@
+import math
+import multiprocessing
+import time
+
+import numpy as np
+
+# Link graph shared copy-on-write with forked sampling workers
+shared_graph = None
+
+# Methods accepted by `solve`
+SOLVERS = ["power", "gauss-seidel", "aitken", "quadratic"]
+
+# Largest distance from PageRank (in total variation) of where a surfer
+# stands after the burn-in steps that are discarded before counting visits
+BURN_IN_TOLERANCE = 1e-4
+
+# Link contributions gathered at once when pulling a matrix of ranks, so
+# the temporary arrays stay in cache however many columns there are
+PULL_CHUNK = 1 << 16
+
+
+class LinkGraph():
+
+    def __init__(self, pages, sources, targets):
+        """
+        Index-mapped link graph of a corpus, stored as sparse arrays.
+            - `pages`: list of page names; page i is `pages[i]`
+            - `out_degree[i]`: number of links on page i
+            - `dangling`: boolean mask of pages without links
+            - `in_indptr`, `in_sources`: CSR form of the transposed link
+              matrix, so the pages linking to page j are
+              in_sources[in_indptr[j]:in_indptr[j + 1]]
+            - `in_weights`: 1 / out_degree of each entry of `in_sources`,
+              i.e. the non-zero values of the transition matrix
+            - `out_indptr`, `out_targets`: CSR form of the link matrix, so the
+              pages linked to by page i are out_targets[out_indptr[i]:out_indptr[i + 1]]
+
+        `sources` and `targets` are parallel integer arrays of links.
+        """
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        n = len(self.pages)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+
+        self.out_degree = np.bincount(sources, minlength=n)
+        self.dangling = self.out_degree == 0
+
+        order = np.argsort(targets, kind="stable")
+        self.in_sources = sources[order]
+        self.in_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=self.in_indptr[1:])
+        self.in_weights = 1 / self.out_degree[self.in_sources]
+
+        order = np.argsort(sources, kind="stable")
+        self.out_targets = targets[order]
+        self.out_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.out_degree, out=self.out_indptr[1:])
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        LinkGraph.from_corpus(corpus) builds a link graph from the
+        dictionary returned by `crawl` (page -> set of linked pages).
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                sources.append(index[page])
+                targets.append(index[link])
+        return cls(pages, sources, targets)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def pull(self, ranks):
+        """
+        Returns the rank each page receives through links, i.e. the
+        transposed transition matrix times `ranks`. `ranks` may be a
+        vector of one rank per page or a matrix with one column per
+        rank vector.
+        """
+        if ranks.ndim == 1:
+            return self.pull_range(ranks, 0, len(self.pages))
+
+        # Pull blocks of pages with about PULL_CHUNK contributions each
+        received = np.zeros_like(ranks)
+        links_per_chunk = max(1, PULL_CHUNK // ranks.shape[1])
+        firsts = np.searchsorted(self.in_indptr, np.arange(0, len(self.in_sources), links_per_chunk),
+                                 side="right") - 1
+        bounds = np.unique(np.concatenate([[0], firsts, [len(self.pages)]]))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            received[start:stop] = self.pull_range(ranks, start, stop)
+        return received
+
+    def step(self, ranks, damping_factor):
+        """
+        Applies one PageRank update to `ranks`. The rank of dangling pages
+        is spread evenly over every page, as if they linked to all pages.
+        """
+        n = len(self.pages)
+        dangling_rank = ranks[self.dangling].sum(axis=0)
+        return (damping_factor * (self.pull(ranks) + dangling_rank / n)
+                + (1 - damping_factor) / n)
+
+    def pull_range(self, ranks, start, stop):
+        """
+        Returns the rank pages `start` to `stop` - 1 receive through links,
+        like `pull` restricted to those pages.
+        """
+        received = np.zeros((stop - start,) + ranks.shape[1:])
+        low = self.in_indptr[start]
+        high = self.in_indptr[stop]
+        if low == high:
+            return received
+        contributions = np.take(ranks, self.in_sources[low:high], axis=0)
+        weights = self.in_weights[low:high]
+        contributions *= weights if contributions.ndim == 1 else weights[:, np.newaxis]
+
+        # Sum each page's in-link segment (reduceat needs non-empty segments)
+        starts = self.in_indptr[start:stop] - low
+        linked = starts < self.in_indptr[start + 1:stop + 1] - low
+        received[linked] = np.add.reduceat(contributions, starts[linked], axis=0)
+        return received
+
+    def sweep(self, ranks, damping_factor, blocks=64):
+        """
+        Applies one block Gauss-Seidel update to `ranks`: the pages are
+        updated in `blocks` consecutive blocks, each using the ranks
+        already updated in earlier blocks of the sweep.
+        """
+        n = len(self.pages)
+        ranks = ranks.copy()
+        dangling_rank = ranks[self.dangling].sum()
+        bounds = np.linspace(0, n, min(blocks, n) + 1).astype(np.int64)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            dangling = self.dangling[start:stop]
+            old_dangling_rank = ranks[start:stop][dangling].sum()
+            block = (damping_factor * (self.pull_range(ranks, start, stop) + dangling_rank / n)
+                     + (1 - damping_factor) / n)
+            ranks[start:stop] = block
+            dangling_rank += block[dangling].sum() - old_dangling_rank
+        return ranks / ranks.sum()
+
+    def push(self, sources, values):
+        """
+        Returns the rank every page receives through links when each page
+        in `sources` gives away the matching entry of `values` evenly over
+        its links, i.e. the transposed transition matrix times a vector
+        that is zero outside `sources`. Only the links of `sources` are
+        read.
+        """
+        degree = self.out_degree[sources]
+        linked = degree > 0
+        sources = sources[linked]
+        degree = degree[linked]
+
+        # Position in `out_targets` of every link of every source
+        offsets = self.out_indptr[sources] - np.cumsum(degree) + degree
+        positions = np.repeat(offsets, degree) + np.arange(degree.sum())
+        return np.bincount(self.out_targets[positions],
+                           weights=np.repeat(values[linked] / degree, degree),
+                           minlength=len(self.pages))
+
+    def teleport_matrix(self, seed_sets):
+        """
+        Returns a matrix with one column per set of page names in
+        `seed_sets`, spreading a teleport probability of 1 evenly over
+        the pages of the set.
+        """
+        teleport = np.zeros((len(self.pages), len(seed_sets)))
+        for column, seeds in enumerate(seed_sets):
+            unknown = [page for page in seeds if page not in self.index]
+            if unknown:
+                raise Exception(f"Unknown page {unknown[0]} in seed set {column} "
+                                f"({', '.join(seeds)})")
+            rows = [self.index[page] for page in seeds]
+            if not rows:
+                raise Exception(f"Seed set {column} is empty")
+            teleport[rows, column] = 1 / len(rows)
+        return teleport
+
+    def ranks_dict(self, ranks):
+        """
+        Returns a dictionary mapping page names to their value in `ranks`.
+        """
+        return {page: float(rank) for page, rank in zip(self.pages, ranks)}
+
+
+def power_iteration(graph, damping_factor, tolerance=1e-6, max_iterations=1000,
+                    start=None):
+    """
+    Runs vectorised power iteration on `graph` from `start` (uniform
+    ranks by default) until the L1 change between iterations is at most
+    `tolerance`, or `max_iterations` have run.
+
+    Returns the rank vector and the number of iterations taken.
+    """
+    ranks, residuals = solve(graph, damping_factor, "power", tolerance, max_iterations, start)
+    return ranks, len(residuals)
+
+
+def solve(graph, damping_factor, method="power", tolerance=1e-6, max_iterations=1000,
+          start=None, period=10, blocks=64):
+    """
+    Computes the PageRank of `graph` from `start` (uniform ranks by
+    default) with one of the `SOLVERS`:
+        - "power": power iteration
+        - "gauss-seidel": block Gauss-Seidel sweeps over `blocks` blocks
+        - "aitken": power iteration, extrapolating every `period`
+          iterations with Aitken's delta-squared process
+        - "quadratic": power iteration, extrapolating every `period`
+          iterations with quadratic extrapolation
+
+    Stops when the L1 change between iterations is at most `tolerance`,
+    or `max_iterations` have run. Returns the rank vector and a list of
+    (residual, seconds) pairs: the L1 change made by each iteration and
+    the time elapsed when it finished.
+    """
+    if method not in SOLVERS:
+        raise Exception(f"Unknown solver: {method}")
+    n = len(graph)
+    ranks = np.full(n, 1 / n) if start is None else np.asarray(start, dtype=float)
+    residuals = []
+    iterates = []
+    started = time.perf_counter()
+
+    for iteration in range(1, max_iterations + 1):
+        if method == "gauss-seidel":
+            new_ranks = graph.sweep(ranks, damping_factor, blocks)
+        else:
+            new_ranks = graph.step(ranks, damping_factor)
+        residual = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        residuals.append((float(residual), time.perf_counter() - started))
+        if residual <= tolerance:
+            break
+
+        # Keep the last iterates and periodically jump towards their limit
+        if method in ("aitken", "quadratic"):
+            iterates = iterates[-3:] + [ranks]
+            if iteration % period == 0:
+                if method == "aitken":
+                    ranks = aitken_extrapolation(*iterates[-3:])
+                else:
+                    ranks = quadratic_extrapolation(*iterates)
+                iterates = []
+
+    return ranks, residuals
+
+
+def aitken_extrapolation(x0, x1, x2):
+    """
+    Returns Aitken's delta-squared estimate of the limit of three
+    successive rank vectors, page by page. Only pages converging
+    monotonically (both changes in the same direction, the second
+    smaller) are extrapolated; the others keep their latest rank.
+    """
+    first = x1 - x0
+    second = x2 - x1
+    usable = (first * second > 0) & (np.abs(second) < np.abs(first))
+    second = second - first
+    ranks = x2.copy()
+    ranks[usable] = x2[usable] - (x2[usable] - x1[usable]) ** 2 / second[usable]
+    return normalise(ranks, x2)
+
+
+def quadratic_extrapolation(x0, x1, x2, x3):
+    """
+    Returns the quadratic extrapolation (Kamvar et al., 2003) of four
+    successive rank vectors: the limit assuming the error lies in the
+    span of the three leading eigenvectors of the transition matrix.
+    """
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    g1, g2, g3 = gamma[0], gamma[1], 1.0
+    ranks = (g1 + g2 + g3) * x1 + (g2 + g3) * x2 + g3 * x3
+    return normalise(ranks, x3)
+
+
+def normalise(ranks, fallback):
+    """
+    Returns `ranks` clipped to be non-negative and scaled to sum to 1,
+    or `fallback` if an extrapolation produced nothing usable.
+    """
+    ranks = np.clip(ranks, 0, None)
+    total = ranks.sum()
+    if not np.isfinite(total) or total <= 0:
+        return fallback
+    return ranks / total
+
+
+def personalized_ranks(graph, damping_factor, teleport, tolerance=1e-6, max_iterations=1000):
+    """
+    Computes personalized PageRank on `graph` for every column of the
+    `teleport` matrix (or a single teleport vector): with probability
+    1 - `damping_factor`, and from pages without links, the surfer jumps
+    to a page drawn from the teleport distribution instead of any page.
+
+    All columns are iterated together, one sparse matrix-matrix product
+    per iteration, and each column stops being updated once its L1
+    change is at most `tolerance`. Returns the matrix (or vector) of
+    ranks and the number of iterations taken.
+    """
+    teleport = np.asarray(teleport, dtype=float)
+    vector = teleport.ndim == 1
+    teleport = teleport.reshape(len(graph), -1)
+    teleport = np.ascontiguousarray(teleport / teleport.sum(axis=0))
+    ranks = teleport.copy()
+
+    # Columns still being iterated, kept contiguous so that pulling
+    # gathers whole rows, and shrunk as columns converge
+    active = np.arange(teleport.shape[1])
+    current = ranks
+    jump = teleport
+
+    iteration = 0
+    while len(active) and iteration < max_iterations:
+        iteration += 1
+        jumped = damping_factor * current[graph.dangling].sum(axis=0) + 1 - damping_factor
+        new = graph.pull(current)
+        new *= damping_factor
+        new += jump * jumped
+        converged = np.abs(new - current).sum(axis=0) <= tolerance
+        current = new
+        if converged.any():
+            ranks[:, active[converged]] = current[:, converged]
+            active = active[~converged]
+            current = np.ascontiguousarray(current[:, ~converged])
+            jump = np.ascontiguousarray(jump[:, ~converged])
+
+    ranks[:, active] = current
+    return (ranks[:, 0] if vector else ranks), iteration
+
+
+def propagate(graph, damping_factor, start, tolerance=1e-6, max_iterations=1000):
+    """
+    Computes PageRank on `graph` from the rank vector `start`, typically
+    the ranks from before a few pages changed, by propagating only the
+    difference: the residual (how far each rank is from its PageRank
+    update) is added to the ranks of the pages where it exceeds
+    `tolerance` / 2N and pushed along their links, while smaller
+    residuals wait. Stops when the residuals sum to at most `tolerance`.
+
+    Returns the rank vector, the number of rounds of pushes and the
+    number of links followed, to compare with the links a cold run
+    follows (one pass over every link per iteration).
+    """
+    n = len(graph)
+    ranks = np.array(start, dtype=float)
+    residual = graph.step(ranks, damping_factor) - ranks
+    links = len(graph.in_sources)
+    threshold = tolerance / (2 * n)
+
+    iteration = 0
+    while np.abs(residual).sum() > tolerance and iteration < max_iterations:
+        iteration += 1
+        frontier = np.flatnonzero(np.abs(residual) > threshold)
+        pushed = residual[frontier]
+        ranks[frontier] += pushed
+        residual[frontier] = 0
+
+        # Push over every link at once if most pages changed
+        if len(frontier) > n // 8:
+            values = np.zeros(n)
+            values[frontier] = pushed
+            received = graph.pull(values)
+            links += len(graph.in_sources)
+        else:
+            received = graph.push(frontier, pushed)
+            links += int(graph.out_degree[frontier].sum())
+        dangling_rank = pushed[graph.dangling[frontier]].sum()
+        residual += damping_factor * (received + dangling_rank / n)
+
+    return ranks + residual, iteration, links
+
+
+def sample_ranks(graph, damping_factor, n, rng=None, walkers=1000, batch_steps=256):
+    """
+    Estimates PageRank from `n` random-surfer samples and returns the
+    fraction of visits to each page.
+    """
+    return walk_counts(graph, damping_factor, n, rng, walkers, batch_steps) / n
+
+
+def walk_counts(graph, damping_factor, n, rng=None, walkers=1000, batch_steps=256):
+    """
+    Returns how often each page is visited in `n` random-surfer samples.
+    """
+    return next(walk_batches(graph, damping_factor, n, rng, walkers, batch_steps))
+
+
+def walk_batches(graph, damping_factor, batch, rng=None, walkers=1000, batch_steps=256):
+    """
+    Yields how often each page is visited in each successive `batch` of
+    random-surfer samples, the surfers carrying on from where the
+    previous batch left them.
+
+    Up to `walkers` independent surfers start on random pages and move
+    in lockstep: each step draws every walker's next page at once from
+    the CSR link arrays with NumPy's Generator `rng`. The first
+    `burn_in_steps` steps are not counted, so that the uniform start
+    does not bias the estimate, and small batches use fewer surfers so
+    that each counts at least as many steps as it discards. Visits are
+    buffered for `batch_steps` steps at a time and counted with
+    `np.bincount`.
+    """
+    rng = np.random.default_rng(rng)
+    n_pages = len(graph)
+    burn_in = burn_in_steps(damping_factor)
+    walkers = max(1, min(walkers, batch // max(burn_in, 1)))
+    positions = rng.integers(n_pages, size=walkers)
+    for _ in range(burn_in):
+        positions = random_step(graph, positions, damping_factor, rng)
+
+    while True:
+        counts = np.zeros(n_pages, dtype=np.int64)
+        remaining = batch
+        while remaining > 0:
+            steps = min(batch_steps, -(-remaining // walkers))
+            visits = np.empty((steps, walkers), dtype=np.int64)
+            for step in range(steps):
+                positions = random_step(graph, positions, damping_factor, rng)
+                visits[step] = positions
+            visits = visits.ravel()[:remaining]
+            counts += np.bincount(visits, minlength=n_pages)
+            remaining -= len(visits)
+        yield counts
+
+
+def burn_in_steps(damping_factor, tolerance=BURN_IN_TOLERANCE):
+    """
+    Returns the number of steps after which a surfer's page is within
+    `tolerance` of PageRank wherever it started: the surfer has jumped
+    to a random page, forgetting its start, unless it followed a link at
+    every step, which happens with probability damping_factor ** steps.
+    """
+    if damping_factor <= 0:
+        return 0
+    return math.ceil(math.log(tolerance) / math.log(damping_factor))
+
+
+def adaptive_sample_ranks(graph, damping_factor, target=1e-3, criterion="interval",
+                          batch=10000, max_samples=10000000, rng=None, walkers=1000):
+    """
+    Estimates PageRank like `sample_ranks`, drawing batches of `batch`
+    samples until the estimate is within `target` by `criterion`:
+        - "change": the largest change of any page's estimate made by
+          the last batch
+        - "interval": the largest half-width of any page's 95% confidence
+          interval, from the spread of the batch estimates (batch means)
+    or `max_samples` samples have been drawn.
+
+    Returns the rank vector, the number of samples drawn and the error
+    reached by `criterion`.
+    """
+    if criterion not in ("change", "interval"):
+        raise Exception(f"Unknown stopping criterion: {criterion}")
+    batches = walk_batches(graph, damping_factor, batch, rng, walkers)
+    counts = np.zeros(len(graph), dtype=np.int64)
+    # Sums of the batch estimates and of their squares, for the variance
+    total = np.zeros(len(graph))
+    squares = np.zeros(len(graph))
+    ranks = None
+    samples = 0
+    error = np.inf
+
+    while samples < max_samples:
+        batch_counts = next(batches)
+        counts += batch_counts
+        samples += batch
+        estimate = batch_counts / batch
+        total += estimate
+        squares += estimate ** 2
+        k = samples // batch
+
+        previous, ranks = ranks, counts / samples
+        if criterion == "change" and previous is not None:
+            error = np.abs(ranks - previous).max()
+        elif criterion == "interval" and k >= 3:
+            variance = np.maximum(squares - total ** 2 / k, 0) / (k - 1)
+            error = 1.96 * np.sqrt(variance.max() / k)
+        if error <= target:
+            break
+
+    return ranks, samples, float(error)
+
+
+def parallel_sample_ranks(graph, damping_factor, n, seed=None, streams=16, processes=None,
+                          walkers=1000):
+    """
+    Estimates PageRank like `sample_ranks`, with the `n` samples split
+    over `streams` independent groups of up to `walkers` surfers run on
+    a pool of `processes` forked workers (one per CPU by default). Each
+    group discards its own burn-in steps and, like `sample_ranks`, uses
+    fewer surfers when its share of the samples is small.
+
+    Each group draws from its own stream spawned from `seed`, and the
+    samples are split over the groups rather than over the workers, so
+    the estimate for a given seed does not depend on `processes`. Without
+    a `seed`, fresh entropy is drawn for every call.
+    """
+    global shared_graph
+
+    children = np.random.SeedSequence(seed).spawn(streams)
+    tasks = [
+        (damping_factor, n // streams + (i < n % streams), child, walkers)
+        for i, child in enumerate(children)
+    ]
+
+    shared_graph = graph
+    try:
+        if processes == 1:
+            counts = sum(map(stream_counts, tasks))
+        else:
+            context = multiprocessing.get_context("fork")
+            with context.Pool(processes) as pool:
+                counts = sum(pool.imap_unordered(stream_counts, tasks))
+    finally:
+        shared_graph = None
+    return counts / n
+
+
+def stream_counts(task):
+    """
+    Runs one group of surfers of `parallel_sample_ranks` in a worker and
+    returns its visit counts.
+    """
+    damping_factor, n, seed, walkers = task
+    return walk_counts(shared_graph, damping_factor, n, np.random.default_rng(seed), walkers)
+
+
+def random_step(graph, positions, damping_factor, rng):
+    """
+    Moves every surfer in `positions` one step: with probability
+    `damping_factor` to a random link of its page (or to any page, if
+    the page has no links), otherwise to a page chosen at random.
+    """
+    degree = graph.out_degree[positions]
+    follow = (rng.random(len(positions)) < damping_factor) & (degree > 0)
+    choice = rng.random(len(positions))
+    moved = rng.integers(len(graph), size=len(positions))
+
+    # Every link on a page is equally likely, so a link is one uniform
+    # pick within the page's segment of `out_targets`
+    links = graph.out_indptr[positions[follow]] + (choice[follow] * degree[follow]).astype(np.int64)
+    moved[follow] = graph.out_targets[links]
+    return moved
@@ -0,0 +1,86 @@
+import argparse
+import os
+
+import numpy as np
+
+
+def generate_graph(num_pages, mean_links=8, links_alpha=2.5, popularity_alpha=1.0,
+                   dangling=0.1, seed=0):
+    """
+    Returns (sources, targets) arrays of the links of a random web graph
+    of `num_pages` pages.
+
+    The number of links on a page follows a power law with exponent
+    `links_alpha` (above 2) scaled to a mean of about `mean_links`,
+    except for a `dangling` fraction of pages that have no links. Links
+    point to pages drawn with Zipf weights 1 / rank ** `popularity_alpha`,
+    so a few hub pages are linked to by many pages. Like `crawl`, a page
+    never links to itself or twice to the same page.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Pareto-tailed link counts, with x_min chosen to give the wanted mean
+    x_min = max(1, mean_links * (links_alpha - 2) / (links_alpha - 1))
+    links = np.round(x_min * (1 - rng.random(num_pages)) ** (-1 / (links_alpha - 1)))
+    links = np.minimum(links, num_pages - 1).astype(np.int64)
+    links[rng.random(num_pages) < dangling] = 0
+
+    # Zipf popularity, shuffled so that hubs are spread over the pages
+    weights = 1 / np.arange(1, num_pages + 1) ** popularity_alpha
+    rng.shuffle(weights)
+    sources = np.repeat(np.arange(num_pages), links)
+    targets = rng.choice(num_pages, size=len(sources), p=weights / weights.sum())
+
+    keep = sources != targets
+    pairs = np.unique(sources[keep] * num_pages + targets[keep])
+    return pairs // num_pages, pairs % num_pages
+
+
+def write_corpus(directory, num_pages, sources, targets):
+    """
+    Writes one HTML page `i.html` per page to `directory`, linking to
+    the pages it has links to in the (sources, targets) arrays, which
+    must be sorted by source.
+    """
+    os.makedirs(directory, exist_ok=True)
+    ends = np.searchsorted(sources, np.arange(num_pages), side="right")
+    start = 0
+    for page, end in enumerate(ends):
+        items = "".join(f'<li><a href="{target}.html">Page {target}</a></li>\n'
+                        for target in targets[start:end].tolist())
+        with open(os.path.join(directory, f"{page}.html"), "w") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<head><title>Page {page}</title></head>\n"
+                    f"<body>\n<h1>Page {page}</h1>\n<ul>\n{items}</ul>\n</body>\n</html>\n")
+        start = end
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic web graph as HTML pages or an edge-list file."
+    )
+    parser.add_argument("output", help="directory for HTML pages, or edge-list file")
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--format", choices=["html", "edges"], default="html")
+    parser.add_argument("--mean-links", type=float, default=8)
+    parser.add_argument("--links-alpha", type=float, default=2.5,
+                        help="power-law exponent of the number of links per page")
+    parser.add_argument("--popularity-alpha", type=float, default=1.0,
+                        help="Zipf exponent of how often each page is linked to")
+    parser.add_argument("--dangling", type=float, default=0.1,
+                        help="fraction of pages without links")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sources, targets = generate_graph(args.pages, args.mean_links, args.links_alpha,
+                                      args.popularity_alpha, args.dangling, args.seed)
+    if args.format == "html":
+        write_corpus(args.output, args.pages, sources, targets)
+    else:
+        from outofcore import write_edges
+        write_edges(args.output, [f"{page}.html" for page in range(args.pages)],
+                    sources, targets)
+    print(f"Wrote {args.pages} pages and {len(sources)} links to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from crawler import crawl, read_cache, write_cache
+from engine import power_iteration, propagate
+from pagerank import DAMPING, TOLERANCE
+
+# Ranks from the last run, kept in the corpus directory
+RANKS_FILENAME = ".ranks.json"
+
+
+def update_ranks(directory, damping_factor=DAMPING, tolerance=TOLERANCE, compare=False):
+    """
+    Re-crawls the corpus in `directory` and returns a (ranks, info) pair,
+    where `ranks` maps each page to its PageRank.
+
+    If the ranks of an earlier run with the same `damping_factor` were
+    saved next to the corpus, they are the starting point and only the
+    changes are propagated (see `engine.propagate`); pages that are new
+    start from 1 / N. Otherwise the ranks are computed from scratch. The
+    new ranks are saved for the next run.
+
+    `info` reports the iterations and links followed, and with `compare`
+    also those of a cold run from uniform ranks.
+    """
+    graph, _ = crawl(directory, compact=True)
+    n = len(graph)
+    links = len(graph.in_sources)
+    path = os.path.join(directory, RANKS_FILENAME)
+    previous = read_ranks(path, damping_factor)
+
+    start = time.perf_counter()
+    if previous is None:
+        ranks, iterations = power_iteration(graph, damping_factor, tolerance)
+        info = {"warm": False, "iterations": iterations, "links": iterations * links}
+    else:
+        initial = np.array([previous.get(page, 1 / n) for page in graph.pages])
+        ranks, iterations, followed = propagate(graph, damping_factor, initial / initial.sum(),
+                                                tolerance)
+        info = {"warm": True, "iterations": iterations, "links": followed}
+    info["seconds"] = time.perf_counter() - start
+
+    if compare:
+        start = time.perf_counter()
+        _, iterations = power_iteration(graph, damping_factor, tolerance)
+        info["cold_seconds"] = time.perf_counter() - start
+        info["cold_iterations"] = iterations
+        info["cold_links"] = iterations * links
+
+    ranks = graph.ranks_dict(ranks)
+    write_ranks(path, damping_factor, ranks)
+    return ranks, info
+
+
+def read_ranks(path, damping_factor):
+    """
+    Returns the ranks saved at `path`, or None if there are none saved
+    for `damping_factor`.
+    """
+    saved = read_cache(path)
+    if saved.get("damping") != damping_factor:
+        return None
+    return saved["ranks"]
+
+
+def write_ranks(path, damping_factor, ranks):
+    """
+    Saves `ranks` to `path`, replacing the old ones in one step.
+    """
+    write_cache(path, {"damping": damping_factor, "ranks": ranks})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update the PageRank of a corpus from the ranks of the last run."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--compare", action="store_true",
+                        help="also time a cold run from uniform ranks")
+    args = parser.parse_args()
+
+    ranks, info = update_ranks(args.corpus, DAMPING, args.tolerance, args.compare)
+    start = "previous ranks" if info["warm"] else "uniform ranks"
+    print(f"From {start}: {info['iterations']} iterations, {info['links']} links "
+          f"followed in {info['seconds']:.4f}s")
+    if args.compare:
+        print(f"Cold run: {info['cold_iterations']} iterations, {info['cold_links']} links "
+              f"followed in {info['cold_seconds']:.4f}s")
+        print(f"Iterations saved: {info['cold_iterations'] - info['iterations']}")
+    if len(ranks) <= 20:
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import argparse
+import mmap
+import os
+import resource
+import struct
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from crawler import extract_links
+from engine import LinkGraph, power_iteration
+from pagerank import DAMPING, TOLERANCE
+
+MAGIC = b"PREDGES1"
+
+# The edges start one page into the file, so chunks can be released by page
+HEADER_SIZE = 4096
+
+# Edges read from the mapping at a time
+CHUNK_EDGES = 1 << 20
+
+
+def write_corpus(directory, path):
+    """
+    Converts the corpus of HTML pages in `directory` to an edge-list
+    file at `path`, one page at a time, without holding the link graph
+    in memory. Returns the number of pages and links written.
+
+    Layout: MAGIC, the number of pages and of edges (8 bytes each), zero
+    padding up to `HEADER_SIZE`, then one (source, target) pair of int32
+    page numbers per link, sorted by source. The page names are written,
+    one per line, to `path` + ".pages".
+    """
+    pages = sorted(filename for filename in os.listdir(directory) if filename.endswith(".html"))
+    index = {page: i for i, page in enumerate(pages)}
+    edges = 0
+    with open(path + ".tmp", "wb") as f:
+        f.write(bytes(HEADER_SIZE))
+        for source, page in enumerate(pages):
+            links = extract_links([os.path.join(directory, page)])[0]
+            targets = sorted(index[link] for link in links if link in index and link != page)
+            pairs = np.empty((len(targets), 2), dtype=np.int32)
+            pairs[:, 0] = source
+            pairs[:, 1] = targets
+            f.write(pairs.tobytes())
+            edges += len(targets)
+        f.seek(0)
+        f.write(MAGIC + struct.pack("<qq", len(pages), edges))
+    os.replace(path + ".tmp", path)
+    write_pages(path, pages)
+    return len(pages), edges
+
+
+def write_edges(path, pages, sources, targets):
+    """
+    Writes the links given as parallel arrays of `sources` and `targets`
+    (indices into `pages`) to an edge-list file at `path`, in the layout
+    of `write_corpus`.
+    """
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    order = np.argsort(sources, kind="stable")
+    pairs = np.empty((len(sources), 2), dtype=np.int32)
+    pairs[:, 0] = sources[order]
+    pairs[:, 1] = targets[order]
+    with open(path + ".tmp", "wb") as f:
+        f.write((MAGIC + struct.pack("<qq", len(pages), len(sources))).ljust(HEADER_SIZE, b"\0"))
+        f.write(pairs.tobytes())
+    os.replace(path + ".tmp", path)
+    write_pages(path, pages)
+
+
+def write_pages(path, pages):
+    """
+    Writes the page names of the edge-list file at `path`, one per line.
+    """
+    with open(path + ".pages", "w") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+
+class EdgeList():
+
+    def __init__(self, path):
+        """
+        Read-only memory mapping of an edge-list file written by
+        `write_corpus` or `write_edges`.
+            - `n`: number of pages
+            - `edges`: number of links
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(len(MAGIC) + 16)
+            if header[:len(MAGIC)] != MAGIC:
+                raise Exception(f"Not an edge-list file: {path}")
+            self.n, self.edges = struct.unpack("<qq", header[len(MAGIC):])
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def chunks(self, chunk_edges=CHUNK_EDGES):
+        """
+        Yields (sources, targets) arrays of up to `chunk_edges` links at
+        a time, read straight from the mapping. Once a chunk has been used
+        its pages are released, so the links never all stay in memory.
+        """
+        for first in range(0, self.edges, chunk_edges):
+            count = min(chunk_edges, self.edges - first)
+            offset = HEADER_SIZE + first * 8
+            pairs = np.frombuffer(self.map, dtype=np.int32, count=2 * count,
+                                  offset=offset).reshape(count, 2)
+            yield pairs[:, 0], pairs[:, 1]
+            del pairs
+            start = offset - offset % mmap.PAGESIZE
+            self.map.madvise(mmap.MADV_DONTNEED, start, offset + count * 8 - start)
+
+    def out_degree(self, chunk_edges=CHUNK_EDGES):
+        """
+        Returns the number of links on each page, in one pass over the links.
+        """
+        degree = np.zeros(self.n, dtype=np.int64)
+        for sources, _ in self.chunks(chunk_edges):
+            degree += np.bincount(sources, minlength=self.n)
+        return degree
+
+    def pages(self):
+        """
+        Returns the list of page names.
+        """
+        with open(self.path + ".pages") as f:
+            return f.read().splitlines()
+
+    def load(self):
+        """
+        Reads every link into an in-memory `engine.LinkGraph`.
+        """
+        pairs = np.fromfile(self.path, dtype=np.int32, offset=HEADER_SIZE).reshape(-1, 2)
+        return LinkGraph(self.pages(), pairs[:, 0], pairs[:, 1])
+
+    def close(self):
+        self.map.close()
+
+
+def stream_power_iteration(edge_list, damping_factor, tolerance=1e-6, max_iterations=1000,
+                           chunk_edges=CHUNK_EDGES):
+    """
+    Runs power iteration like `engine.power_iteration`, streaming over
+    the links of `edge_list` in chunks of `chunk_edges` every iteration,
+    so that only a few vectors of one value per page stay in memory.
+
+    Returns the rank vector and the number of iterations taken.
+    """
+    n = edge_list.n
+    degree = edge_list.out_degree(chunk_edges)
+    dangling = degree == 0
+    share = np.zeros(n)
+    share[~dangling] = 1 / degree[~dangling]
+    del degree
+
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        received = np.zeros(n)
+        given = ranks * share
+        for sources, targets in edge_list.chunks(chunk_edges):
+            received += np.bincount(targets, weights=given[sources], minlength=n)
+        new_ranks = (damping_factor * (received + ranks[dangling].sum() / n)
+                     + (1 - damping_factor) / n)
+        residual = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if residual <= tolerance:
+            break
+    return ranks, iteration
+
+
+def rank(path, engine="stream", tolerance=TOLERANCE, chunk_edges=CHUNK_EDGES):
+    """
+    Ranks the pages of the edge-list file at `path` with the streaming
+    or in-memory `engine` and returns a dictionary of the iterations,
+    seconds spent loading the links (in memory only) and ranking, links
+    processed per second while ranking and peak resident memory (MiB)
+    of this process.
+    """
+    edge_list = EdgeList(path)
+    start = time.perf_counter()
+    if engine == "stream":
+        load_seconds = 0
+        _, iterations = stream_power_iteration(edge_list, DAMPING, tolerance,
+                                               chunk_edges=chunk_edges)
+    else:
+        graph = edge_list.load()
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        _, iterations = power_iteration(graph, DAMPING, tolerance)
+    seconds = time.perf_counter() - start
+    edges = edge_list.edges
+    edge_list.close()
+
+    # ru_maxrss is in KiB on Linux
+    return {
+        "engine": engine,
+        "pages": edge_list.n,
+        "edges": edges,
+        "iterations": iterations,
+        "load_seconds": load_seconds,
+        "seconds": seconds,
+        "edges_per_second": iterations * edges / seconds,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Out-of-core PageRank over memory-mapped edge lists."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="write a corpus as an edge-list file")
+    convert.add_argument("corpus")
+    convert.add_argument("edges")
+    run = commands.add_parser("rank", help="rank the pages of an edge-list file")
+    run.add_argument("edges")
+    run.add_argument("--engine", choices=["stream", "memory"], default="stream")
+    run.add_argument("--tolerance", type=float, default=TOLERANCE)
+    run.add_argument("--chunk", type=int, default=CHUNK_EDGES,
+                     help="links read at a time by the streaming engine")
+    compare = commands.add_parser(
+        "compare", help="measure both engines, each in a fresh process"
+    )
+    compare.add_argument("edges")
+    compare.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        pages, edges = write_corpus(args.corpus, args.edges)
+        print(f"Wrote {pages} pages and {edges} links to {args.edges}")
+    elif args.command == "rank":
+        result = rank(args.edges, args.engine, args.tolerance, args.chunk)
+        print(f"{result['engine']}: loaded in {result['load_seconds']:.3f}s, "
+              f"{result['iterations']} iterations over "
+              f"{result['edges']} links in {result['seconds']:.3f}s "
+              f"({result['edges_per_second'] / 1e6:.1f}M links/s), "
+              f"peak RSS {result['peak_rss_mib']:.0f} MiB")
+    else:
+        # Peak RSS is per process, so each engine gets its own
+        for engine in ["memory", "stream"]:
+            subprocess.run([sys.executable, __file__, "rank", args.edges,
+                            "--engine", engine, "--tolerance", str(args.tolerance)],
+                           check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,89 @@
+import argparse
 import os
 import random
 import re
-import sys
 import copy
 
 DAMPING = 0.85
 SAMPLES = 10000
+TOLERANCE = 1e-6
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Rank the pages of a corpus.")
+    parser.add_argument("corpus")
+    parser.add_argument("--engine", choices=["dict", "sparse"], default="dict",
+                        help="iterate with the dictionary implementation or the "
+                             "NumPy sparse-matrix engine")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="L1 convergence tolerance of the sparse engine")
+    parser.add_argument("--solver", choices=["power", "gauss-seidel", "aitken", "quadratic"],
+                        default="power", help="solver of the sparse engine")
+    parser.add_argument("--max-iterations", type=int, default=1000,
+                        help="iteration cap of the sparse engine")
+    parser.add_argument("--sampler", choices=["dict", "vectorised"], default="dict",
+                        help="sample with the dictionary implementation or the "
+                             "NumPy multi-walker sampler")
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--seed", type=int, help="seed of the vectorised sampler")
+    parser.add_argument("--processes", type=int,
+                        help="split the vectorised sampler's surfers into seeded "
+                             "groups run on this many processes")
+    parser.add_argument("--target", type=float,
+                        help="sample adaptively (with the vectorised sampler) in "
+                             "batches until the error is below TARGET")
+    parser.add_argument("--criterion", choices=["interval", "change"], default="interval",
+                        help="error of adaptive sampling: largest 95%% confidence "
+                             "half-width, or largest change made by a batch")
+    parser.add_argument("--seeds", metavar="FILE",
+                        help="also rank pages for each line of space-separated "
+                             "seed pages in FILE (personalized PageRank)")
+    parser.add_argument("--cache", action="store_true",
+                        help="crawl on a thread pool, reusing the links of "
+                             "unchanged pages from the corpus's link index")
+    args = parser.parse_args()
+    if args.cache:
+        from crawler import crawl as crawl_cached
+        corpus, _ = crawl_cached(args.corpus)
+    else:
+        corpus = crawl(args.corpus)
 
     # Rank pages using sampling
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
-    print(f"PageRank Results from Sampling (n = {SAMPLES})")
+    if args.target is not None:
+        ranks, samples, error = sample_pagerank_adaptive(corpus, DAMPING, args.target,
+                                                         args.criterion, args.seed)
+        print(f"PageRank Results from Sampling "
+              f"(n = {samples}, {args.criterion} error {error:.2g})")
+    else:
+        if args.sampler == "vectorised":
+            ranks = sample_pagerank_vectorised(corpus, DAMPING, args.samples, args.seed,
+                                               args.processes)
+        else:
+            ranks = sample_pagerank(corpus, DAMPING, args.samples)
+        print(f"PageRank Results from Sampling (n = {args.samples})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
     
     # Rank pages using iteration
-    ranks = iterate_pagerank(corpus, DAMPING)
+    if args.engine == "sparse":
+        ranks = iterate_pagerank_sparse(corpus, DAMPING, args.tolerance, args.solver,
+                                        args.max_iterations)
+    else:
+        ranks = iterate_pagerank(corpus, DAMPING)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    
+
+    # Rank pages for each seed set
+    if args.seeds:
+        with open(args.seeds) as f:
+            seed_sets = [line.split() for line in f if line.strip()]
+        for seeds, ranks in zip(seed_sets, personalized_pagerank(corpus, DAMPING, seed_sets,
+                                                                 args.tolerance)):
+            print(f"Personalized PageRank Results (seeds: {', '.join(seeds)})")
+            for page in sorted(ranks):
+                print(f"  {page}: {ranks[page]:.4f}")
+
 
 def crawl(directory):
     """
@@ -175,5 +234,76 @@ def iterate_pagerank(corpus, damping_factor):
     
     return ranked_pages
 
+
+def sample_pagerank_vectorised(corpus, damping_factor, n, seed=None, processes=None):
+    """
+    Returns PageRank values for each page like `sample_pagerank`, but
+    draws the `n` samples with many random surfers moving at once over
+    the CSR link arrays of `engine.py` (which needs NumPy). `seed` makes
+    the estimate reproducible.
+
+    With a number of `processes`, the surfers are split into
+    independently seeded groups run on a process pool; the estimate for
+    a given seed is the same for any number of processes.
+    """
+    from engine import LinkGraph, sample_ranks, parallel_sample_ranks
+
+    graph = LinkGraph.from_corpus(corpus)
+    if processes is not None:
+        ranks = parallel_sample_ranks(graph, damping_factor, n, seed, processes=processes)
+    else:
+        ranks = sample_ranks(graph, damping_factor, n, seed)
+    return graph.ranks_dict(ranks)
+
+
+def sample_pagerank_adaptive(corpus, damping_factor, target, criterion="interval", seed=None):
+    """
+    Returns PageRank values for each page like `sample_pagerank_vectorised`,
+    but instead of a fixed number of samples draws batches of samples
+    until the estimates are within `target` (see
+    `engine.adaptive_sample_ranks` for the `criterion`).
+
+    Returns the dictionary of ranks, the number of samples drawn and the
+    error reached.
+    """
+    from engine import LinkGraph, adaptive_sample_ranks
+
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, samples, error = adaptive_sample_ranks(graph, damping_factor, target, criterion,
+                                                  rng=seed)
+    return graph.ranks_dict(ranks), samples, error
+
+
+def personalized_pagerank(corpus, damping_factor, seed_sets, tolerance=TOLERANCE):
+    """
+    Returns one dictionary of personalized PageRank values per set of
+    pages in `seed_sets`: the random surfer jumps to a page of the seed
+    set, rather than any page, when not following a link. All the seed
+    sets are solved together by `engine.personalized_ranks`.
+    """
+    from engine import LinkGraph, personalized_ranks
+
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = personalized_ranks(graph, damping_factor, graph.teleport_matrix(seed_sets),
+                                  tolerance)
+    return [graph.ranks_dict(column) for column in ranks.T]
+
+
+def iterate_pagerank_sparse(corpus, damping_factor, tolerance=TOLERANCE, solver="power",
+                            max_iterations=1000):
+    """
+    Returns PageRank values for each page like `iterate_pagerank`, but
+    converts the corpus into an index-mapped sparse transition matrix and
+    runs a vectorised `solver` (see `engine.solve`, which needs NumPy)
+    until the L1 change between iterations is at most `tolerance`, or
+    for at most `max_iterations` iterations.
+    """
+    from engine import LinkGraph, solve
+
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = solve(graph, damping_factor, solver, tolerance, max_iterations)
+    return graph.ranks_dict(ranks)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
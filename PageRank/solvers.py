@@ -0,0 +1,36 @@
+import argparse
+
+from crawler import crawl
+from engine import SOLVERS, solve
+from pagerank import DAMPING, TOLERANCE
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the convergence of the PageRank solvers on a corpus."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--damping", type=float, default=DAMPING)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--solvers", default=",".join(SOLVERS),
+                        help="comma-separated solvers to compare")
+    parser.add_argument("--residuals", action="store_true",
+                        help="print the residual and time of every iteration")
+    args = parser.parse_args()
+
+    graph, _ = crawl(args.corpus, compact=True)
+    for solver in args.solvers.split(","):
+        _, residuals = solve(graph, args.damping, solver, args.tolerance,
+                             args.max_iterations)
+        residual, seconds = residuals[-1]
+        converged = "converged" if residual <= args.tolerance else "stopped"
+        print(f"{solver}: {converged} after {len(residuals)} iterations "
+              f"in {seconds:.4f}s (residual {residual:.3g})")
+        if args.residuals:
+            for iteration, (residual, seconds) in enumerate(residuals, 1):
+                print(f"  {iteration}: {residual:.3e} at {seconds:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+import pagerank
+from engine import (LinkGraph, parallel_sample_ranks, power_iteration, propagate, sample_ranks,
+                    solve)
+from outofcore import EdgeList, stream_power_iteration, write_corpus
+
+# Seeds averaged over, and largest difference allowed between the mean
+# estimate and the exact ranks (a few standard errors of the mean)
+SEEDS = 30
+TOLERANCE = 0.003
+
+
+def corpus_graph():
+    """
+    Returns the link graph of corpus0 and its exact PageRank.
+    """
+    graph = LinkGraph.from_corpus(pagerank.crawl(os.path.join(os.path.dirname(__file__), "corpus0")))
+    ranks, _ = solve(graph, pagerank.DAMPING, "power", 1e-12)
+    return graph, ranks
+
+
+def test_sample_ranks_is_unbiased():
+    graph, exact = corpus_graph()
+    mean = np.mean([
+        sample_ranks(graph, pagerank.DAMPING, pagerank.SAMPLES, seed) for seed in range(SEEDS)
+    ], axis=0)
+    assert np.abs(mean - exact).max() < TOLERANCE
+
+
+def test_parallel_sample_ranks_is_unbiased():
+    graph, exact = corpus_graph()
+    mean = np.mean([
+        parallel_sample_ranks(graph, pagerank.DAMPING, pagerank.SAMPLES, seed, processes=1)
+        for seed in range(SEEDS)
+    ], axis=0)
+    assert np.abs(mean - exact).max() < TOLERANCE
+
+
+def test_parallel_sample_ranks_ignores_processes():
+    graph, _ = corpus_graph()
+    ranks = [
+        parallel_sample_ranks(graph, pagerank.DAMPING, pagerank.SAMPLES, 1, processes=processes)
+        for processes in (1, 2, 3)
+    ]
+    assert np.array_equal(ranks[0], ranks[1]) and np.array_equal(ranks[0], ranks[2])
+
+
+def test_unseeded_parallel_runs_differ():
+    corpus = pagerank.crawl(os.path.join(os.path.dirname(__file__), "corpus0"))
+    runs = [
+        pagerank.sample_pagerank_vectorised(corpus, pagerank.DAMPING, pagerank.SAMPLES,
+                                            processes=1)
+        for _ in range(2)
+    ]
+    assert runs[0] != runs[1]
+
+
+def test_propagate_from_perturbed_ranks_converges():
+    graph, exact = corpus_graph()
+    rng = np.random.default_rng(0)
+    for scale in (0.01, 0.5):
+        start = exact * (1 + scale * rng.uniform(-1, 1, len(exact)))
+        ranks, _, _ = propagate(graph, pagerank.DAMPING, start / start.sum(), 1e-10)
+        assert np.abs(ranks - exact).max() < 1e-8
+
+
+def test_stream_power_iteration_matches_power_iteration(tmp_path):
+    graph, _ = corpus_graph()
+    path = str(tmp_path / "corpus0.edges")
+    write_corpus(os.path.join(os.path.dirname(__file__), "corpus0"), path)
+    edge_list = EdgeList(path)
+    streamed, streamed_iterations = stream_power_iteration(edge_list, pagerank.DAMPING, 1e-10,
+                                                           chunk_edges=3)
+    streamed = dict(zip(edge_list.pages(), streamed))
+    edge_list.close()
+    ranks, iterations = power_iteration(graph, pagerank.DAMPING, 1e-10)
+    assert streamed_iterations == iterations
+    for page, rank in graph.ranks_dict(ranks).items():
+        assert abs(streamed[page] - rank) < 1e-12
+
+
+def test_teleport_matrix_rejects_unknown_seed():
+    graph, _ = corpus_graph()
+    with pytest.raises(Exception, match="Unknown page missing.html in seed set 1"):
+        graph.teleport_matrix([["1.html"], ["2.html", "missing.html"]])